@@ -25,6 +25,8 @@ Workflow:
 4. Claude Code generates gold-standard WCAG-compliant HTML
 """
 
+import importlib
+
 from .converter import (
     PDFToAccessibleHTML,
     ConversionResult,
@@ -48,27 +50,6 @@ from .wcag_validator import (
     validate_html_file,
 )
 
-# Optional imports for math and image processing
-try:
-    from .math_processor import MathDetector, MathMLConverter, MathBlock
-except ImportError:
-    MathDetector = None
-    MathMLConverter = None
-    MathBlock = None
-
-try:
-    from .image_extractor import PDFImageExtractor, ImageProcessor, ExtractedImage
-except ImportError:
-    PDFImageExtractor = None
-    ImageProcessor = None
-    ExtractedImage = None
-
-try:
-    from .alt_text_generator import AltTextGenerator, AltTextResult
-except ImportError:
-    AltTextGenerator = None
-    AltTextResult = None
-
 try:
     from .embed_images import embed_images, load_metadata, create_figure_element
 except ImportError:
@@ -76,6 +57,36 @@ except ImportError:
     load_metadata = None
     create_figure_element = None
 
+# Optional math and image processing exports are imported on first access
+# (PEP 562), so importing the package doesn't load their dependencies.
+# Each resolves to None if its module can't be imported.
+_OPTIONAL_EXPORTS = {
+    'MathDetector': 'math_processor',
+    'MathMLConverter': 'math_processor',
+    'MathBlock': 'math_processor',
+    'PDFImageExtractor': 'image_extractor',
+    'ImageProcessor': 'image_extractor',
+    'ExtractedImage': 'image_extractor',
+    'AltTextGenerator': 'alt_text_generator',
+    'AltTextResult': 'alt_text_generator',
+}
+
+
+def __getattr__(name: str):
+    module_name = _OPTIONAL_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        module = importlib.import_module(f'.{module_name}', __name__)
+        value = getattr(module, name)
+    except ImportError:
+        value = None
+
+    globals()[name] = value
+    return value
+
+
 __version__ = '1.1.0'  # WCAG 2.2 AA update
 __all__ = [
     # Core
@@ -5,41 +5,195 @@ Generates accessible alt text for images using Claude's vision API
 with OCR fallback.
 """
 
+import asyncio
 import base64
+import hashlib
+import io
 import logging
 import os
+import re
+import struct
+import threading
 import time
-from dataclasses import dataclass
-from typing import Optional, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+from .claude_processor import ResponseCache
 
 if TYPE_CHECKING:
     from .image_extractor import ExtractedImage
 
 logger = logging.getLogger(__name__)
 
+# HTTP connection pool shared by every generator's sync Anthropic client, so
+# per-page generators reuse open connections and TLS sessions
+_HTTP_CLIENT = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+
+
+def _get_http_client(anthropic):
+    """Return the shared HTTP client, creating it on first use."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        with _HTTP_CLIENT_LOCK:
+            if _HTTP_CLIENT is None:
+                _HTTP_CLIENT = anthropic.DefaultHttpxClient()
+    return _HTTP_CLIENT
+
+
+# Number of active ocr_thread_limit() blocks that need OMP_THREAD_LIMIT set
+_OCR_LIMIT_USERS = 0
+_OCR_LIMIT_LOCK = threading.Lock()
+
+
+@contextmanager
+def ocr_thread_limit():
+    """
+    Keep tesseract single-threaded for the duration of the block.
+
+    OCR runs several images at once, so OpenMP threads inside each tesseract
+    would only oversubscribe the CPU. OMP_THREAD_LIMIT is read when tesserocr
+    loads OpenMP and whenever pytesseract spawns tesseract, so both must
+    happen inside the block. A value set by the caller is left alone;
+    otherwise the variable is removed again when the last block exits.
+    """
+    global _OCR_LIMIT_USERS
+    with _OCR_LIMIT_LOCK:
+        owned = _OCR_LIMIT_USERS > 0 or 'OMP_THREAD_LIMIT' not in os.environ
+        if owned:
+            _OCR_LIMIT_USERS += 1
+            os.environ['OMP_THREAD_LIMIT'] = '1'
+    try:
+        yield
+    finally:
+        if owned:
+            with _OCR_LIMIT_LOCK:
+                _OCR_LIMIT_USERS -= 1
+                if not _OCR_LIMIT_USERS:
+                    del os.environ['OMP_THREAD_LIMIT']
+
 
 @dataclass
 class AltTextResult:
     """Result of alt text generation."""
     alt_text: str               # Short alt text (< 150 chars)
     long_description: str       # Detailed description for expandable section
-    source: str                 # 'claude', 'ocr', 'caption', 'generic'
+    source: str                 # 'claude', 'ocr', 'caption', 'generic', 'decorative'
     success: bool = True
 
 
+class _RateLimiter:
+    """Thread-safe limiter that spaces out API call starts by a minimum interval."""
+
+    def __init__(self, interval: float = 0.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def _reserve(self) -> float:
+        """Reserve the next call slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        return wait
+
+    def acquire(self) -> None:
+        """Block until the next call slot is available."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Wait without blocking the event loop until the next call slot is available."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
 class AltTextGenerator:
     """Generate accessible alt text for images."""
 
+    # Bump when SYSTEM_PROMPT or response parsing changes to invalidate cached results
+    PROMPT_VERSION = "v1.0"
+
     # Maximum retries for API calls
+    # Retries are delegated to the anthropic SDK, which backs off with jitter
+    # and honours Retry-After, so concurrent workers don't retry in lockstep
     MAX_RETRIES = 3
-    BASE_DELAY = 1.0  # seconds
+    REQUEST_TIMEOUT = 60.0  # seconds
+    CONNECT_TIMEOUT = 5.0   # seconds
+
+    # Uncaptioned images below these limits are treated as decorative
+    DECORATIVE_MAX_AREA = 2500      # pixels (e.g. 50x50 icons, bullets)
+    DECORATIVE_MAX_BYTES = 1024     # encoded size (rules, spacers, blank fills)
+
+    # Images larger than this are downscaled before upload; Claude resizes
+    # anything beyond ~1568px on the long edge internally anyway
+    UPLOAD_MAX_EDGE = 1568          # pixels
+    UPLOAD_RESIZE_MIN_BYTES = 200_000
+    UPLOAD_JPEG_QUALITY = 85
+
+    # Maximum alt text length; longer text is cut and ends with ELLIPSIS
+    MAX_ALT_LENGTH = 150
+    ELLIPSIS = "..."
+
+    # Image format -> media type sent to Claude; other formats map to image/<format>
+    MEDIA_TYPES = {
+        'jpg': 'image/jpeg',
+        'jpeg': 'image/jpeg',
+        'png': 'image/png',
+        'gif': 'image/gif',
+        'webp': 'image/webp',
+    }
+
+    # Multi-image requests: cap on total base64 payload per request
+    MAX_REQUEST_IMAGE_BYTES = 20 * 1024 * 1024
+    MAX_TOKENS_PER_IMAGE = 500
+
+    # Matches "IMAGE N ALT: ..." / "IMAGE N LONG: ..." lines in multi-image responses
+    BATCH_RESPONSE_FIELD_PATTERN = re.compile(
+        r'^[ \t]*IMAGE[ \t]+(\d+)[ \t]+(ALT|LONG):[ \t]*(.*?)\s*$', re.IGNORECASE | re.MULTILINE
+    )
+
+    # Runs of whitespace collapsed when cleaning OCR output
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+
+    # Matches "ALT: ..." / "LONG: ..." lines in Claude's response
+    RESPONSE_FIELD_PATTERN = re.compile(r'^[ \t]*(ALT|LONG):[ \t]*(.*?)\s*$', re.IGNORECASE | re.MULTILINE)
+
+    # Static instructions, sent as a cached system prompt so the identical
+    # prefix is reused across every image in a document
+    SYSTEM_PROMPT = """Analyze this image and provide accessibility text.
+
+REQUIREMENTS:
+1. ALT TEXT: A concise description (max 150 characters) suitable for screen readers.
+   - Focus on the essential content/purpose
+   - Don't start with "Image of" or "Picture of"
+   - Be specific but brief
+
+2. LONG DESCRIPTION: A detailed description (2-4 sentences) for users who want more detail.
+   - Include important visual details
+   - Describe data, charts, or diagrams precisely
+   - Mention colors/layout if relevant to meaning
+
+FORMAT YOUR RESPONSE EXACTLY LIKE THIS:
+ALT: [your alt text here]
+LONG: [your long description here]"""
 
     def __init__(
         self,
         api_key: Optional[str] = None,
         model: str = "claude-sonnet-4-20250514",
         use_ai: bool = True,
-        use_ocr_fallback: bool = True
+        use_ocr_fallback: bool = True,
+        max_concurrency: int = 5,
+        images_per_request: int = 1,
+        cache_dir: Optional[str] = None,
+        enable_cache: bool = True
     ):
         """
         Initialize alt text generator.
@@ -49,36 +203,101 @@ class AltTextGenerator:
             model: Claude model to use for vision
             use_ai: Whether to use Claude API for alt text
             use_ocr_fallback: Whether to fall back to OCR
+            max_concurrency: Maximum number of images processed in parallel by generate_batch
+            images_per_request: Images described per Claude request in generate_batch
+                (1 sends each image separately)
+            cache_dir: Directory for caching Claude results across runs
+            enable_cache: Whether to cache Claude results
         """
         self.api_key = api_key or os.environ.get('ANTHROPIC_API_KEY')
         self.model = model
         self.use_ai = use_ai and self.api_key is not None
         self.use_ocr_fallback = use_ocr_fallback
+        self.max_concurrency = max(1, max_concurrency)
+        self.images_per_request = max(1, images_per_request)
+        self._rate_limiter = _RateLimiter()
 
+        # Clients and image libraries are imported on first use, so runs
+        # without images never pay for anthropic/PIL/OCR imports
         self._client = None
-        if self.use_ai:
-            try:
-                import anthropic
-                self._client = anthropic.Anthropic(api_key=self.api_key)
-                logger.debug(f"Claude API initialized with model {model}")
-            except ImportError:
-                logger.warning("anthropic package not installed. AI alt text unavailable.")
-                self.use_ai = False
-            except Exception as e:
-                logger.warning(f"Failed to initialize Claude API: {e}")
-                self.use_ai = False
+        self._async_client = None
+        self._client_lock = threading.Lock()
+
+        self.cache = None
+        if self.use_ai and enable_cache:
+            if cache_dir is None:
+                cache_dir = Path.home() / '.cache' / 'pdf_converter' / 'alt_text'
+            self.cache = ResponseCache(cache_dir)
 
-        # Check for OCR availability
-        self._pytesseract = None
         self._pil = None
-        if self.use_ocr_fallback:
+        self._tesserocr = None
+        self._pytesseract = None
+        self._image_libs_loaded = False
+        self._image_libs_lock = threading.Lock()
+        self._ocr_local = threading.local()
+
+    @property
+    def client(self):
+        """Lazy initialization of Anthropic client."""
+        if self._client is None and self.use_ai:
+            with self._client_lock:
+                if self._client is None and self.use_ai:
+                    try:
+                        import anthropic
+                        self._client = anthropic.Anthropic(
+                            http_client=_get_http_client(anthropic),
+                            **self._client_options(anthropic)
+                        )
+                        logger.debug("Claude API initialized with model %s", self.model)
+                    except ImportError:
+                        logger.warning("anthropic package not installed. AI alt text unavailable.")
+                        self.use_ai = False
+                    except Exception as e:
+                        logger.warning("Failed to initialize Claude API: %s", e)
+                        self.use_ai = False
+        return self._client
+
+    def _client_options(self, anthropic) -> dict:
+        """Constructor options shared by the sync and async Anthropic clients."""
+        return dict(
+            api_key=self.api_key,
+            max_retries=self.MAX_RETRIES,
+            timeout=anthropic.Timeout(self.REQUEST_TIMEOUT, connect=self.CONNECT_TIMEOUT),
+        )
+
+    def _load_image_libs(self) -> None:
+        """Import PIL and the OCR engine on first use."""
+        if self._image_libs_loaded:
+            return
+
+        with self._image_libs_lock:
+            if self._image_libs_loaded:
+                return
+
+            # PIL is used for OCR, decorative checks and downscaling uploads
             try:
-                import pytesseract
                 from PIL import Image
-                self._pytesseract = pytesseract
                 self._pil = Image
             except ImportError:
-                logger.debug("OCR packages not available for fallback")
+                logger.debug("PIL not available for image handling")
+
+            # Check for OCR availability: prefer in-process tesserocr, fall back
+            # to pytesseract (which spawns a tesseract subprocess per call)
+            if self.use_ocr_fallback and self._pil:
+                try:
+                    # Batches OCR several images at once, so tesserocr loads
+                    # OpenMP with each tesseract limited to one thread
+                    with ocr_thread_limit():
+                        import tesserocr
+                    self._tesserocr = tesserocr
+                except ImportError:
+                    try:
+                        import pytesseract
+                        self._pytesseract = pytesseract
+                    except ImportError:
+                        logger.debug("OCR packages not available for fallback")
+
+            self._image_libs_loaded = True
 
     def generate(
         self,
@@ -95,14 +314,61 @@ class AltTextGenerator:
         Returns:
             AltTextResult with generated text
         """
+        # Skip the expensive AI/OCR paths for icons, rules and blank fills
+        if (self.use_ai or self.use_ocr_fallback) and self._is_decorative(image):
+            return self._decorative_result()
+
         # Try Claude API first
-        if self.use_ai and self._client:
+        if self.use_ai and self.client:
             result = self._try_claude_with_retry(image, context)
             if result.success:
                 return result
 
+        return self._generate_fallback(image)
+
+    async def generate_async(
+        self,
+        image: "ExtractedImage",
+        context: str = ""
+    ) -> AltTextResult:
+        """
+        Generate alt text for an image without blocking the event loop.
+
+        Uses the AsyncAnthropic client for the Claude call; the CPU-bound
+        decorative check and OCR fallback run in worker threads.
+
+        Args:
+            image: ExtractedImage object
+            context: Document context (nearby text, title, etc.)
+
+        Returns:
+            AltTextResult with generated text
+        """
+        if self.use_ai or self.use_ocr_fallback:
+            if await asyncio.to_thread(self._is_decorative, image):
+                return self._decorative_result()
+
+        if self.use_ai and self._get_async_client():
+            result = await self._try_claude_with_retry_async(image, context)
+            if result.success:
+                return result
+
+        return await asyncio.to_thread(self._generate_fallback, image)
+
+    def _generate_fallback(self, image: "ExtractedImage") -> AltTextResult:
+        """
+        Generate alt text without Claude: OCR, then caption, then generic.
+
+        Args:
+            image: ExtractedImage object
+
+        Returns:
+            AltTextResult
+        """
+        self._load_image_libs()
+
         # Try OCR fallback
-        if self.use_ocr_fallback and self._pytesseract:
+        if self.use_ocr_fallback and (self._tesserocr or self._pytesseract):
             result = self._try_ocr_fallback(image)
             if result.success and result.alt_text:
                 return result
@@ -114,13 +380,54 @@ class AltTextGenerator:
         # Final generic fallback
         return self._generic_fallback(image)
 
+    def _decorative_result(self) -> AltTextResult:
+        """Result for decorative images: empty alt text, rendered as presentation."""
+        return AltTextResult(
+            alt_text="",
+            long_description="",
+            source="decorative",
+            success=True
+        )
+
+    def _is_decorative(self, image: "ExtractedImage") -> bool:
+        """
+        Cheap preflight check for decorative images.
+
+        Args:
+            image: ExtractedImage object
+
+        Returns:
+            True if the image is tiny or a single solid color and has no caption
+        """
+        if image.nearby_caption:
+            return False
+
+        self._load_image_libs()
+
+        if image.width and image.height and image.width * image.height < self.DECORATIVE_MAX_AREA:
+            return True
+
+        if len(image.data) < self.DECORATIVE_MAX_BYTES:
+            return True
+
+        if self._pil:
+            try:
+                img = self._pil.open(io.BytesIO(image.data))
+                extrema = img.convert('RGB').getextrema()
+                if all(low == high for low, high in extrema):
+                    return True
+            except Exception as e:
+                logger.debug("Decorative check could not decode image: %s", e)
+
+        return False
+
     def _try_claude_with_retry(
         self,
         image: "ExtractedImage",
         context: str
     ) -> AltTextResult:
         """
-        Try Claude API with exponential backoff retry.
+        Try Claude API (the SDK retries rate limits, timeouts and 5xx errors).
 
         Args:
             image: ExtractedImage object
@@ -129,33 +436,51 @@ class AltTextGenerator:
         Returns:
             AltTextResult
         """
-        last_error = None
+        cache_key = self._get_cache_key(image, context)
+        cached = self._get_cached(cache_key)
+        if cached:
+            return cached
 
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                return self._call_claude_vision(image, context)
+        try:
+            result = self._call_claude_vision(image, context)
+            self._set_cached(cache_key, result)
+            return result
+        except Exception as e:
+            logger.warning("Claude API error: %s", e)
 
-            except Exception as e:
-                error_str = str(e).lower()
-                last_error = e
-
-                # Check for rate limit
-                if 'rate' in error_str or '429' in error_str:
-                    delay = self.BASE_DELAY * (2 ** attempt)
-                    logger.warning(f"Rate limited, retrying in {delay}s (attempt {attempt + 1})")
-                    time.sleep(delay)
-                    continue
+        return AltTextResult(
+            alt_text="",
+            long_description="",
+            source="claude",
+            success=False
+        )
 
-                # Check for timeout
-                if 'timeout' in error_str:
-                    delay = self.BASE_DELAY * (2 ** attempt)
-                    logger.warning(f"Timeout, retrying in {delay}s (attempt {attempt + 1})")
-                    time.sleep(delay)
-                    continue
+    async def _try_claude_with_retry_async(
+        self,
+        image: "ExtractedImage",
+        context: str
+    ) -> AltTextResult:
+        """
+        Async variant of _try_claude_with_retry.
+
+        Args:
+            image: ExtractedImage object
+            context: Document context
+
+        Returns:
+            AltTextResult
+        """
+        cache_key = self._get_cache_key(image, context)
+        cached = self._get_cached(cache_key)
+        if cached:
+            return cached
 
-                # Other errors - don't retry
-                logger.warning(f"Claude API error: {e}")
-                break
+        try:
+            result = await self._call_claude_vision_async(image, context)
+            self._set_cached(cache_key, result)
+            return result
+        except Exception as e:
+            logger.warning("Claude API error: %s", e)
 
         return AltTextResult(
             alt_text="",
@@ -164,10 +489,118 @@ class AltTextGenerator:
             success=False
         )
 
+    def _get_cache_key(self, image: "ExtractedImage", context: str) -> str:
+        """
+        Build the cache key for an image's Claude result.
+
+        Covers everything that goes into the request: image bytes, model,
+        context and caption.
+
+        Args:
+            image: ExtractedImage object
+            context: Document context
+
+        Returns:
+            Cache key string
+        """
+        image_digest = hashlib.blake2b(image.data, digest_size=16).hexdigest()
+        return f"{self.model}|{image_digest}|{context[:500]}|{image.nearby_caption}"
+
+    def _get_cached(self, cache_key: str) -> Optional[AltTextResult]:
+        """Look up a cached Claude result."""
+        if not self.cache:
+            return None
+
+        cached = self.cache.get(cache_key, self.PROMPT_VERSION)
+        if cached:
+            try:
+                return AltTextResult(**cached)
+            except TypeError:
+                logger.debug("Ignoring malformed alt text cache entry")
+        return None
+
+    def _set_cached(self, cache_key: str, result: AltTextResult) -> None:
+        """Cache a successful Claude result."""
+        if self.cache and result.success:
+            self.cache.set(cache_key, self.PROMPT_VERSION, asdict(result))
+
+    def _get_image_payload(self, image: "ExtractedImage") -> Tuple[str, str]:
+        """
+        Get the media type and base64 data to send for an image.
+
+        Large images are downscaled to JPEG first. Otherwise the base64
+        already embedded in the image's data URI is reused when present, so
+        the image bytes are only encoded when there is none.
+
+        Args:
+            image: ExtractedImage object
+
+        Returns:
+            Tuple of (media_type, base64_data)
+        """
+        downscaled = self._downscale_for_upload(image)
+        if downscaled:
+            return "image/jpeg", base64.b64encode(downscaled).decode()
+
+        if image.data_uri:
+            header, sep, base64_data = image.data_uri.partition(',')
+            if not sep:
+                # Bare base64 string without a data URI header
+                base64_data = image.data_uri
+            elif header.startswith('data:') and header.endswith(';base64'):
+                return header[5:-7], base64_data
+        else:
+            base64_data = base64.b64encode(image.data).decode()
+
+        media_type = self.MEDIA_TYPES.get(image.format.lower(), f"image/{image.format}")
+        return media_type, base64_data
+
+    def _downscale_for_upload(self, image: "ExtractedImage") -> Optional[bytes]:
+        """
+        Downscale an oversized image to JPEG before sending it to Claude.
+
+        Args:
+            image: ExtractedImage object
+
+        Returns:
+            JPEG bytes, or None if the image is small enough to send as-is
+        """
+        if len(image.data) < self.UPLOAD_RESIZE_MIN_BYTES:
+            return None
+
+        self._load_image_libs()
+        if not self._pil:
+            return None
+
+        try:
+            img = self._pil.open(io.BytesIO(image.data))
+            if max(img.size) <= self.UPLOAD_MAX_EDGE:
+                return None
+
+            img.thumbnail((self.UPLOAD_MAX_EDGE, self.UPLOAD_MAX_EDGE), self._pil.Resampling.LANCZOS)
+
+            # Flatten transparency onto white for JPEG
+            if img.mode in ('RGBA', 'P', 'LA'):
+                img = img.convert('RGBA')
+                background = self._pil.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[-1])
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            output = io.BytesIO()
+            img.save(output, format='JPEG', quality=self.UPLOAD_JPEG_QUALITY)
+            return output.getvalue()
+
+        except Exception as e:
+            logger.debug("Could not downscale image for upload: %s", e)
+            return None
+
     def _call_claude_vision(
         self,
         image: "ExtractedImage",
-        context: str
+        context: str,
+        payload: Optional[Tuple[str, str]] = None
     ) -> AltTextResult:
         """
         Call Claude vision API for alt text generation.
@@ -175,40 +608,81 @@ class AltTextGenerator:
         Args:
             image: ExtractedImage object
             context: Document context
+            payload: Pre-computed (media_type, base64_data) from _get_image_payload
 
         Returns:
             AltTextResult
         """
-        # Get base64 image data
-        if image.data_uri:
-            # Extract base64 from data URI
-            base64_data = image.data_uri.split(',')[1] if ',' in image.data_uri else image.data_uri
-        else:
-            base64_data = base64.b64encode(image.data).decode()
+        request = self._build_request(image, context, payload)
+
+        # Wait for a rate limit slot, then call Claude API
+        self._rate_limiter.acquire()
+        response = self.client.messages.create(**request)
+
+        return self._result_from_response(response)
+
+    async def _call_claude_vision_async(
+        self,
+        image: "ExtractedImage",
+        context: str,
+        payload: Optional[Tuple[str, str]] = None
+    ) -> AltTextResult:
+        """
+        Async variant of _call_claude_vision using the AsyncAnthropic client.
+
+        Args:
+            image: ExtractedImage object
+            context: Document context
+            payload: Pre-computed (media_type, base64_data) from _get_image_payload
+
+        Returns:
+            AltTextResult
+        """
+        request = self._build_request(image, context, payload)
+
+        await self._rate_limiter.acquire_async()
+        response = await self._get_async_client().messages.create(**request)
+
+        return self._result_from_response(response)
+
+    def _get_async_client(self):
+        """Lazy initialization of the AsyncAnthropic client."""
+        if self._async_client is None and self.use_ai:
+            try:
+                import anthropic
+                self._async_client = anthropic.AsyncAnthropic(**self._client_options(anthropic))
+            except Exception as e:
+                logger.warning("Failed to initialize async Claude API: %s", e)
+        return self._async_client
+
+    def _build_request(
+        self,
+        image: "ExtractedImage",
+        context: str,
+        payload: Optional[Tuple[str, str]] = None
+    ) -> dict:
+        """
+        Build the messages.create arguments for an image.
 
-        # Determine media type
-        media_type = f"image/{image.format}"
-        if image.format in ('jpg', 'jpeg'):
-            media_type = "image/jpeg"
+        Args:
+            image: ExtractedImage object
+            context: Document context
+            payload: Pre-computed (media_type, base64_data) from _get_image_payload
 
+        Returns:
+            Keyword arguments for messages.create
+        """
         # Build prompt
         prompt = self._build_prompt(image, context)
 
-        # Call Claude API
-        response = self._client.messages.create(
+        return dict(
             model=self.model,
-            max_tokens=500,
+            max_tokens=self.MAX_TOKENS_PER_IMAGE,
+            system=self._system_blocks(),
             messages=[{
                 "role": "user",
                 "content": [
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": media_type,
-                            "data": base64_data,
-                        }
-                    },
+                    self._image_block(payload or self._get_image_payload(image)),
                     {
                         "type": "text",
                         "text": prompt
@@ -217,6 +691,92 @@ class AltTextGenerator:
             }]
         )
 
+    def _system_blocks(self) -> list:
+        """System prompt content, marked for prompt caching."""
+        return [{
+            "type": "text",
+            "text": self.SYSTEM_PROMPT,
+            "cache_control": {"type": "ephemeral"},
+        }]
+
+    def _image_block(self, payload: Tuple[str, str]) -> dict:
+        """Build an image content block from (media_type, base64_data)."""
+        media_type, base64_data = payload
+        return {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": media_type,
+                "data": base64_data,
+            }
+        }
+
+    def _call_claude_vision_batch(
+        self,
+        images: list,
+        context: str,
+        payloads: Optional[list] = None
+    ) -> List[Optional[AltTextResult]]:
+        """
+        Describe several images in a single Claude request.
+
+        Args:
+            images: List of ExtractedImage objects
+            context: Document context
+            payloads: Pre-computed (media_type, base64_data) per image
+
+        Returns:
+            AltTextResult per image, or None where the response had no entry for it
+        """
+        payloads = payloads or [self._get_image_payload(image) for image in images]
+
+        content = []
+        captions = []
+        for number, (image, payload) in enumerate(zip(images, payloads), 1):
+            content.append({"type": "text", "text": f"Image {number}:"})
+            content.append(self._image_block(payload))
+            if image.nearby_caption:
+                captions.append(f"Image {number}: {image.nearby_caption}")
+
+        prompt = f"Provide accessibility text for each of the {len(images)} images above."
+        if context:
+            prompt += f"\n\nDOCUMENT CONTEXT:\n{context[:500]}"
+        if captions:
+            prompt += "\n\nCAPTIONS FOUND NEAR IMAGES:\n" + "\n".join(captions)
+        prompt += (
+            "\n\nFor each image N, replace the ALT:/LONG: labels with numbered ones:"
+            "\nIMAGE N ALT: [alt text]\nIMAGE N LONG: [long description]"
+        )
+        content.append({"type": "text", "text": prompt})
+
+        self._rate_limiter.acquire()
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=self.MAX_TOKENS_PER_IMAGE * len(images),
+            system=self._system_blocks(),
+            messages=[{"role": "user", "content": content}],
+        )
+
+        fields = {}
+        for number, key, value in self.BATCH_RESPONSE_FIELD_PATTERN.findall(response.content[0].text):
+            fields.setdefault(int(number), {})[key.upper()] = value
+
+        results = []
+        for number in range(1, len(images) + 1):
+            entry = fields.get(number, {})
+            if not entry.get('ALT') and not entry.get('LONG'):
+                results.append(None)
+                continue
+            results.append(AltTextResult(
+                alt_text=self._truncate_alt_text(entry.get('ALT', '')),
+                long_description=entry.get('LONG', ''),
+                source="claude",
+                success=True
+            ))
+        return results
+
+    def _result_from_response(self, response) -> AltTextResult:
+        """Convert a Claude messages response into an AltTextResult."""
         # Parse response
         response_text = response.content[0].text.strip()
 
@@ -231,23 +791,8 @@ class AltTextGenerator:
         )
 
     def _build_prompt(self, image: "ExtractedImage", context: str) -> str:
-        """Build the prompt for Claude."""
-        prompt = """Analyze this image and provide accessibility text.
-
-REQUIREMENTS:
-1. ALT TEXT: A concise description (max 150 characters) suitable for screen readers.
-   - Focus on the essential content/purpose
-   - Don't start with "Image of" or "Picture of"
-   - Be specific but brief
-
-2. LONG DESCRIPTION: A detailed description (2-4 sentences) for users who want more detail.
-   - Include important visual details
-   - Describe data, charts, or diagrams precisely
-   - Mention colors/layout if relevant to meaning
-
-FORMAT YOUR RESPONSE EXACTLY LIKE THIS:
-ALT: [your alt text here]
-LONG: [your long description here]"""
+        """Build the per-image part of the prompt (instructions live in SYSTEM_PROMPT)."""
+        prompt = "Provide accessibility text for this image."
 
         if context:
             prompt += f"\n\nDOCUMENT CONTEXT:\n{context[:500]}"
@@ -259,32 +804,31 @@ LONG: [your long description here]"""
 
     def _parse_response(self, response: str) -> tuple:
         """Parse Claude's response into alt text and long description."""
-        alt_text = ""
-        long_desc = ""
-
-        lines = response.strip().split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.upper().startswith('ALT:'):
-                alt_text = line[4:].strip()
-            elif line.upper().startswith('LONG:'):
-                long_desc = line[5:].strip()
+        # Single scan for "ALT:" / "LONG:" lines; later lines win
+        fields = {
+            key.upper(): value
+            for key, value in self.RESPONSE_FIELD_PATTERN.findall(response)
+        }
+        alt_text = fields.get('ALT', '')
+        long_desc = fields.get('LONG', '')
 
         # If parsing failed, use the whole response
         if not alt_text and not long_desc:
+            response = response.strip()
+            long_desc = response
             # Try to split by sentence
-            if len(response) <= 150:
+            if len(response) <= self.MAX_ALT_LENGTH:
                 alt_text = response
             else:
-                sentences = response.split('.')
-                alt_text = sentences[0].strip() + '.' if sentences else response[:150]
-                long_desc = response
+                alt_text = f"{response.split('.', 1)[0].strip()}."
 
-        # Ensure alt text isn't too long
-        if len(alt_text) > 150:
-            alt_text = alt_text[:147] + "..."
+        return self._truncate_alt_text(alt_text), long_desc
 
-        return alt_text, long_desc
+    def _truncate_alt_text(self, text: str) -> str:
+        """Bound alt text to MAX_ALT_LENGTH, marking cut text with an ellipsis."""
+        if len(text) <= self.MAX_ALT_LENGTH:
+            return text
+        return text[:self.MAX_ALT_LENGTH - len(self.ELLIPSIS)] + self.ELLIPSIS
 
     def _try_ocr_fallback(self, image: "ExtractedImage") -> AltTextResult:
         """
@@ -297,31 +841,33 @@ LONG: [your long description here]"""
             AltTextResult
         """
         try:
-            import io
             img = self._pil.open(io.BytesIO(image.data))
 
             # Run OCR
-            text = self._pytesseract.image_to_string(img, config='--psm 6').strip()
+            if self._tesserocr:
+                api = self._get_tesserocr_api()
+                api.SetImage(img)
+                text = api.GetUTF8Text().strip()
+            else:
+                with ocr_thread_limit():
+                    text = self._pytesseract.image_to_string(img, config='--psm 6').strip()
 
             if text and len(text) > 10:
-                # Clean up OCR text
-                text = ' '.join(text.split())
+                # Clean up OCR text in a single pass (text is already stripped)
+                text = self.WHITESPACE_PATTERN.sub(' ', text)
 
                 # Create alt text
-                if len(text) <= 140:
-                    alt_text = f"Image containing text: {text}"
-                else:
-                    alt_text = f"Image containing text: {text[:120]}..."
+                snippet = text if len(text) <= 120 else f"{text[:120]}{self.ELLIPSIS}"
 
                 return AltTextResult(
-                    alt_text=alt_text[:150],
+                    alt_text=self._truncate_alt_text(f"Image containing text: {snippet}"),
                     long_description=f"Text extracted from image: {text}",
                     source="ocr",
                     success=True
                 )
 
         except Exception as e:
-            logger.debug(f"OCR fallback failed: {e}")
+            logger.debug("OCR fallback failed: %s", e)
 
         return AltTextResult(
             alt_text="",
@@ -330,6 +876,15 @@ LONG: [your long description here]"""
             success=False
         )
 
+    def _get_tesserocr_api(self):
+        """Get this thread's tesserocr API handle, creating it on first use."""
+        api = getattr(self._ocr_local, 'api', None)
+        if api is None:
+            # PSM.SINGLE_BLOCK matches pytesseract's '--psm 6'
+            api = self._tesserocr.PyTessBaseAPI(psm=self._tesserocr.PSM.SINGLE_BLOCK)
+            self._ocr_local.api = api
+        return api
+
     def _use_caption_fallback(self, image: "ExtractedImage") -> AltTextResult:
         """
         Use nearby caption as alt text.
@@ -342,14 +897,8 @@ LONG: [your long description here]"""
         """
         caption = image.nearby_caption.strip()
 
-        # Clean up caption
-        if len(caption) <= 150:
-            alt_text = caption
-        else:
-            alt_text = caption[:147] + "..."
-
         return AltTextResult(
-            alt_text=alt_text,
+            alt_text=self._truncate_alt_text(caption),
             long_description=caption,
             source="caption",
             success=True
@@ -368,9 +917,13 @@ LONG: [your long description here]"""
         # Generate basic description
         alt_text = f"Figure on page {image.page}"
 
-        # Add dimensions if known
-        if image.width and image.height:
-            long_desc = f"Image ({image.width}x{image.height} pixels) on page {image.page}. No description available."
+        # Add dimensions if known, reading them from the image header if needed
+        width, height = image.width, image.height
+        if not (width and height):
+            width, height = self._peek_dimensions(image.data) or (None, None)
+
+        if width and height:
+            long_desc = f"Image ({width}x{height} pixels) on page {image.page}. No description available."
         else:
             long_desc = f"Image on page {image.page}. No description available."
 
@@ -381,6 +934,42 @@ LONG: [your long description here]"""
             success=True
         )
 
+    @staticmethod
+    def _peek_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+        """
+        Read width and height from PNG or JPEG header bytes without decoding.
+
+        Args:
+            data: Encoded image bytes
+
+        Returns:
+            (width, height), or None for other formats or truncated data
+        """
+        if not data:
+            return None
+
+        # PNG: dimensions are the first fields of the IHDR chunk
+        if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+            return struct.unpack('>II', data[16:24])
+
+        # JPEG: walk the marker segments to the first start-of-frame
+        if data[:3] == b'\xff\xd8\xff':
+            pos = 2
+            while pos + 9 <= len(data):
+                if data[pos] != 0xFF:
+                    return None
+                marker = data[pos + 1]
+                if marker == 0xFF:      # fill byte
+                    pos += 1
+                    continue
+                # SOF0-SOF15, excluding DHT (C4), JPG (C8) and DAC (CC)
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    height, width = struct.unpack('>HH', data[pos + 5:pos + 9])
+                    return width, height
+                pos += 2 + struct.unpack('>H', data[pos + 2:pos + 4])[0]
+
+        return None
+
     def generate_batch(
         self,
         images: list,
@@ -390,22 +979,183 @@ LONG: [your long description here]"""
         """
         Generate alt text for multiple images.
 
+        Identical images (same bytes and caption) are only described once.
+        Images are processed concurrently (up to max_concurrency at a time);
+        API call starts are spaced by batch_delay so the request rate stays
+        bounded regardless of concurrency.
+
         Args:
             images: List of ExtractedImage objects
             context: Document context
-            batch_delay: Delay between API calls to avoid rate limiting
+            batch_delay: Minimum delay between API call starts to avoid rate limiting
 
         Returns:
-            List of AltTextResult objects
+            List of AltTextResult objects, in the same order as images
         """
-        results = []
+        self._rate_limiter.interval = batch_delay if self.use_ai else 0.0
+        unique_images, index_map = self._dedupe_images(images)
+
+        if self.use_ai and self.images_per_request > 1 and self.client:
+            unique_results = self._generate_grouped(unique_images, context)
+        else:
+            unique_results = self._map_concurrently(
+                lambda image: self.generate(image, context), unique_images
+            )
 
-        for i, image in enumerate(images):
-            result = self.generate(image, context)
-            results.append(result)
+        return self._expand_results(unique_results, index_map)
 
-            # Apply delay between API calls (if using AI)
-            if self.use_ai and i < len(images) - 1:
-                time.sleep(batch_delay)
+    def _map_concurrently(self, func, items: list) -> list:
+        """Apply func to items on up to max_concurrency threads, preserving order."""
+        if self.max_concurrency == 1 or len(items) <= 1:
+            return [func(item) for item in items]
 
+        # Calls are I/O-bound (HTTPS or the tesseract subprocess), so threads
+        # overlap the waits; map() preserves input order.
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(items))) as executor:
+            return list(executor.map(func, items))
+
+    def _generate_grouped(self, images: list, context: str) -> list:
+        """
+        Generate alt text sending up to images_per_request images per Claude call.
+
+        Decorative and cached images are resolved up front. Any image the
+        multi-image response doesn't cover goes through generate() on its own.
+
+        Args:
+            images: List of unique ExtractedImage objects
+            context: Document context
+
+        Returns:
+            List of AltTextResult objects, in the same order as images
+        """
+        results = [None] * len(images)
+        pending = []
+
+        for index, image in enumerate(images):
+            if self._is_decorative(image):
+                results[index] = self._decorative_result()
+                continue
+            cached = self._get_cached(self._get_cache_key(image, context))
+            if cached:
+                results[index] = cached
+            else:
+                pending.append((index, self._get_image_payload(image)))
+
+        # Group by count and total payload size
+        groups = []
+        current = []
+        current_bytes = 0
+        for index, payload in pending:
+            size = len(payload[1])
+            if current and (
+                len(current) >= self.images_per_request
+                or current_bytes + size > self.MAX_REQUEST_IMAGE_BYTES
+            ):
+                groups.append(current)
+                current, current_bytes = [], 0
+            current.append((index, payload))
+            current_bytes += size
+        if current:
+            groups.append(current)
+
+        def describe_group(group):
+            group_images = [images[index] for index, _ in group]
+            try:
+                group_results = self._call_claude_vision_batch(
+                    group_images, context, [payload for _, payload in group]
+                )
+            except Exception as e:
+                logger.warning("Claude multi-image request failed: %s", e)
+                group_results = [None] * len(group)
+
+            for (index, _), image, result in zip(group, group_images, group_results):
+                if result:
+                    self._set_cached(self._get_cache_key(image, context), result)
+                    results[index] = result
+                else:
+                    results[index] = self.generate(image, context)
+
+        self._map_concurrently(describe_group, groups)
+        return results
+
+    async def generate_batch_async(
+        self,
+        images: list,
+        context: str = "",
+        batch_delay: float = 0.5,
+        max_concurrency: Optional[int] = None
+    ) -> list:
+        """
+        Generate alt text for multiple images concurrently on the event loop.
+
+        Args:
+            images: List of ExtractedImage objects
+            context: Document context
+            batch_delay: Minimum delay between API call starts to avoid rate limiting
+            max_concurrency: Maximum in-flight images (default: self.max_concurrency)
+
+        Returns:
+            List of AltTextResult objects, in the same order as images
+        """
+        self._rate_limiter.interval = batch_delay if self.use_ai else 0.0
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        unique_images, index_map = self._dedupe_images(images)
+
+        async def generate_guarded(image):
+            async with semaphore:
+                return await self.generate_async(image, context)
+
+        unique_results = await asyncio.gather(*(generate_guarded(image) for image in unique_images))
+        return self._expand_results(unique_results, index_map)
+
+    def _dedupe_images(self, images: list) -> Tuple[list, List[int]]:
+        """
+        Collapse repeated images (logos, watermarks, icons) within a batch.
+
+        Images are only hashed when another image shares their dimensions
+        and byte length, so obviously distinct images skip hashing entirely.
+
+        Args:
+            images: List of ExtractedImage objects
+
+        Returns:
+            Tuple of (unique images, index into unique images for each input image)
+        """
+        size_counts = {}
+        for image in images:
+            size_key = (image.width, image.height, len(image.data))
+            size_counts[size_key] = size_counts.get(size_key, 0) + 1
+
+        unique_images = []
+        index_map = []
+        seen = {}
+
+        for image in images:
+            size_key = (image.width, image.height, len(image.data))
+            if size_counts[size_key] == 1:
+                index_map.append(len(unique_images))
+                unique_images.append(image)
+                continue
+
+            # Caption is part of the prompt, so it is part of the identity
+            key = (hashlib.blake2b(image.data, digest_size=16).digest(), image.nearby_caption)
+            if key not in seen:
+                seen[key] = len(unique_images)
+                unique_images.append(image)
+            index_map.append(seen[key])
+
+        if len(unique_images) < len(images):
+            logger.info("Describing %d unique images for %d occurrences", len(unique_images), len(images))
+
+        return unique_images, index_map
+
+    def _expand_results(self, unique_results: list, index_map: List[int]) -> list:
+        """Fan results for unique images back out to every occurrence."""
+        results = []
+        used = set()
+        for index in index_map:
+            result = unique_results[index]
+            # Give repeated occurrences their own copy rather than a shared object
+            results.append(replace(result) if index in used else result)
+            used.add(index)
         return results
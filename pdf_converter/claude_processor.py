@@ -5,18 +5,69 @@ Uses Claude API to review extracted PDF text, fix ordering issues,
 and detect document structure for WCAG-compliant HTML generation.
 """
 
+import asyncio
 import hashlib
 import json
 import logging
 import os
-import re
+import threading
+import time
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
+_JSON_DECODER = json.JSONDecoder()
+
+# orjson when installed; its JSONDecodeError subclasses json.JSONDecodeError,
+# so callers catch the same exception either way
+if orjson:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+# Anthropic clients shared by every processor using the same API key, so
+# processors created per request reuse one connection pool
+_CLIENT_CACHE: Dict[Optional[str], Any] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+# Pooled connections can't be shared with a forked child; start it afresh
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_CLIENT_CACHE.clear)
+
+# Rate-limit exception types of the API client, looked up on the first API
+# error rather than importing anthropic along with this module
+_RATE_LIMIT_ERRORS: Optional[tuple] = None
+
+
+def _rate_limit_errors() -> tuple:
+    """Return the API client's rate-limit exception types (empty without anthropic)."""
+    global _RATE_LIMIT_ERRORS
+    if _RATE_LIMIT_ERRORS is None:
+        try:
+            from anthropic import RateLimitError
+        except ImportError:
+            _RATE_LIMIT_ERRORS = ()
+        else:
+            _RATE_LIMIT_ERRORS = (RateLimitError,)
+    return _RATE_LIMIT_ERRORS
+
 
 class BlockType(str, Enum):
     """Types of content blocks in a document."""
@@ -36,6 +87,9 @@ class BlockType(str, Enum):
     FOOTER = "footer"
 
 
+_VALID_BLOCK_TYPES = frozenset(e.value for e in BlockType)
+
+
 @dataclass
 class StructuredBlock:
     """A block of structured content from Claude."""
@@ -78,6 +132,178 @@ class ClaudeInvalidResponseError(ClaudeProcessingError):
     pass
 
 
+class _TokenBucket:
+    """
+    Requests-per-minute and tokens-per-minute budget, refilled continuously.
+
+    Callers wait for capacity before each API call instead of finding out
+    about the limit from a rate-limit error. A limit of None is not enforced.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._available_requests = float(requests_per_minute or 0)
+        self._available_tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: int) -> float:
+        """Take capacity for one request, or return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+
+            wait = 0.0
+            if self.requests_per_minute:
+                self._available_requests = min(
+                    self.requests_per_minute,
+                    self._available_requests + elapsed * self.requests_per_minute / 60
+                )
+                if self._available_requests < 1:
+                    wait = (1 - self._available_requests) * 60 / self.requests_per_minute
+            if self.tokens_per_minute:
+                self._available_tokens = min(
+                    self.tokens_per_minute,
+                    self._available_tokens + elapsed * self.tokens_per_minute / 60
+                )
+                # A request bigger than the whole budget waits for a full bucket
+                needed = min(tokens, self.tokens_per_minute)
+                if self._available_tokens < needed:
+                    wait = max(wait, (needed - self._available_tokens) * 60 / self.tokens_per_minute)
+
+            if wait > 0:
+                return wait
+
+            self._available_requests -= 1
+            self._available_tokens -= tokens
+            return 0.0
+
+    def acquire(self, tokens: int) -> None:
+        """Block until a request of the given token estimate fits the budget."""
+        while True:
+            wait = self._take(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int) -> None:
+        """Wait without blocking the event loop until the request fits the budget."""
+        while True:
+            wait = self._take(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class _StreamingBlockParser:
+    """
+    Incrementally pull complete block objects out of streamed response JSON.
+
+    Tracks string/escape state and bracket nesting across chunks; each object
+    that opens directly inside a top-level array (the "blocks" list in the
+    response schema) is decoded as soon as its closing brace arrives.
+    """
+
+    def __init__(self):
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._block = None          # characters of the block being read
+
+    def feed(self, text: str) -> Iterator[dict]:
+        """Consume the next piece of text and yield any blocks it completes."""
+        for char in text:
+            if char == '{' and not self._in_string and self._stack == ['{', '[']:
+                self._block = []
+            if self._block is not None:
+                self._block.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._stack.append(char)
+            elif char in '}]' and self._stack:
+                self._stack.pop()
+                if self._block is not None and self._stack == ['{', '[']:
+                    block_text = ''.join(self._block)
+                    self._block = None
+                    try:
+                        yield _json_loads(block_text)
+                    except json.JSONDecodeError:
+                        pass
+
+
+def _repair_truncated_json(text: str) -> Optional[dict]:
+    """
+    Recover the complete part of a JSON object that was cut off mid-stream.
+
+    Scans from the first brace tracking string/escape state and bracket
+    nesting, remembering the last point where everything before it was
+    complete (an opened container, a closed one, or a comma between
+    members). The text is cut there and the still-open containers closed.
+
+    Args:
+        text: Response text ending partway through a JSON object
+
+    Returns:
+        The decoded object holding every complete member, or None
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+
+    stack = []
+    in_string = False
+    escape = False
+    cut, cut_stack = None, ()
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append(char)
+            cut, cut_stack = pos + 1, tuple(stack)
+        elif char in '}]':
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                # The object is complete after all
+                return _json_loads(text[start:pos + 1])
+            cut, cut_stack = pos + 1, tuple(stack)
+        elif char == ',':
+            cut, cut_stack = pos, tuple(stack)
+
+    if cut is None:
+        return None
+
+    closing = ''.join('}' if char == '{' else ']' for char in reversed(cut_stack))
+    try:
+        return _json_loads(text[start:cut] + closing)
+    except json.JSONDecodeError:
+        return None
+
+
 class ResponseCache:
     """File-based cache for Claude responses."""
 
@@ -89,39 +315,76 @@ class ResponseCache:
 
     def _get_cache_key(self, text: str, prompt_version: str) -> str:
         """Generate cache key from text content hash."""
-        content = f"{prompt_version}:{text}"
-        return hashlib.sha256(content.encode()).hexdigest()[:32]
-
-    def _get_cache_path(self, key: str) -> Path:
+        # Hash the parts in turn rather than building one combined string,
+        # which would copy the whole (possibly multi-megabyte) text first
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(prompt_version.encode())
+        digest.update(b':')
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def _get_cache_path(self, key: str, compressed: bool = False) -> Path:
         """Get file path for cache key."""
-        return self.cache_dir / f"{key}.json"
+        return self.cache_dir / (f"{key}.json.zst" if compressed else f"{key}.json")
 
     def get(self, text: str, prompt_version: str) -> Optional[dict]:
         """Retrieve cached response if exists."""
         key = self._get_cache_key(text, prompt_version)
-        cache_path = self._get_cache_path(key)
 
-        if cache_path.exists():
+        # Entries are zstd-compressed when zstandard is installed; plain
+        # entries are still read so existing caches keep working
+        for compressed in ((True, False) if zstandard else (False,)):
+            cache_path = self._get_cache_path(key, compressed)
+            try:
+                data = cache_path.read_bytes()
+            except FileNotFoundError:
+                continue
+            except IOError:
+                logger.warning(f"Failed to read cache file {cache_path}")
+                return None
+
             try:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    logger.debug(f"Cache hit for key {key[:8]}...")
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
+                if compressed:
+                    data = zstandard.ZstdDecompressor().decompress(data)
+                response = _json_loads(data)
+            except (json.JSONDecodeError, getattr(zstandard, 'ZstdError', ValueError)):
                 logger.warning(f"Failed to read cache file {cache_path}")
                 return None
+
+            logger.debug(f"Cache hit for key {key[:8]}...")
+            return response
+
         return None
 
     def set(self, text: str, prompt_version: str, response: dict) -> None:
         """Cache response."""
         key = self._get_cache_key(text, prompt_version)
-        cache_path = self._get_cache_path(key)
+        cache_path = self._get_cache_path(key, compressed=zstandard is not None)
 
+        # Compact output: the cache is only read back by this class
+        data = _json_dumps(response)
+
+        # Compressor contexts aren't safe to share between threads, and the
+        # alt text generator writes from a thread pool, so use one per entry
+        if zstandard:
+            data = zstandard.ZstdCompressor(level=3).compress(data)
+
+        # Write to a temporary file and rename it into place, so a crash
+        # mid-write never leaves a truncated entry behind. The name is unique
+        # per thread so concurrent writers of one key don't interleave.
+        tmp_path = cache_path.with_name(
+            f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(response, f, indent=2)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, cache_path)
             logger.debug(f"Cached response with key {key[:8]}...")
         except IOError as e:
             logger.warning(f"Failed to write cache: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
 
 
 class ClaudeProcessor:
@@ -134,7 +397,23 @@ class ClaudeProcessor:
     3. Return structured JSON for HTML generation
     """
 
-    PROMPT_VERSION = "v1.0"
+    # The response reproduces all of a chunk's text as JSON, so chunks are
+    # sized to this fraction of max_tokens, leaving room for the markup
+    CHUNK_OUTPUT_FRACTION = 0.6
+
+    # Usage counters accumulated in token_usage
+    USAGE_FIELDS = (
+        'input_tokens',
+        'output_tokens',
+        'cache_creation_input_tokens',
+        'cache_read_input_tokens',
+    )
+
+    # Seconds between status checks while a Message Batch is processing
+    BATCH_POLL_INTERVAL = 10.0
+
+    # Bump when the prompts or response parsing change to invalidate cached results
+    PROMPT_VERSION = "v1.1"
 
     SYSTEM_PROMPT = '''You are a document structure analyzer for PDF accessibility conversion. Your task is to:
 
@@ -169,39 +448,38 @@ The gold standard document structure follows this order:
 
 OUTPUT FORMAT: Return ONLY valid JSON, no markdown code fences, no explanation.'''
 
-    USER_PROMPT_TEMPLATE = '''## Raw Extracted Text to Process:
-{raw_text}
-
-## Instructions:
-Analyze this text and return a JSON object with the following structure:
+    # Static instructions come before the document text so the whole prefix
+    # (system prompt + instructions) is a prompt-cache hit across chunks
+    INSTRUCTIONS_PROMPT = '''## Instructions:
+Analyze the raw extracted text that follows and return a JSON object with the following structure:
 
-{{
+{
   "title": "Document title",
   "authors": ["Author 1", "Author 2"],
   "abstract": "Abstract text if present, null otherwise",
   "blocks": [
-    {{
+    {
       "block_type": "heading",
       "content": "Section heading text",
       "heading_level": 2,
       "section_number": "1."
-    }},
-    {{
+    },
+    {
       "block_type": "paragraph",
       "content": "Paragraph text content"
-    }},
-    {{
+    },
+    {
       "block_type": "reference",
       "content": "Reference citation text",
       "reference_number": 1
-    }}
+    }
   ],
-  "metadata": {{
+  "metadata": {
     "keywords": [],
     "arxiv_id": null,
     "date": null
-  }}
-}}
+  }
+}
 
 Valid block_type values: title, author, abstract, metadata, toc_item, heading, paragraph, list_item, reference, figure_caption, table, definition, algorithm, footer
 
@@ -210,6 +488,17 @@ For references, include reference_number (1, 2, 3, etc.).
 
 Return ONLY the JSON object, no other text.'''
 
+    RAW_TEXT_HEADER = '''## Raw Extracted Text to Process:
+'''
+
+    MULTI_DOCUMENT_NOTE = '''## Multiple Documents:
+The text below contains {count} separate documents, each starting with a "## DOC N ##" line. Process each one independently and return a JSON array with one object per document, in order. Each object follows the structure above plus a "doc_index" field holding N.
+
+'''
+
+    # Most documents described by one shared request in process_texts
+    MAX_DOCS_PER_REQUEST = 8
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -217,6 +506,11 @@ Return ONLY the JSON object, no other text.'''
         max_tokens: int = 16384,
         cache_dir: Optional[str] = None,
         enable_cache: bool = True,
+        use_batch: bool = False,
+        max_concurrency: int = 5,
+        allow_partial: bool = False,
+        rpm: Optional[int] = 50,
+        tpm: Optional[int] = None,
     ):
         """
         Initialize Claude processor.
@@ -227,11 +521,25 @@ Return ONLY the JSON object, no other text.'''
             max_tokens: Maximum tokens in response
             cache_dir: Directory for caching responses
             enable_cache: Whether to use caching
+            use_batch: Send the chunks of large documents as one Message Batch
+                (half the cost, but results can take minutes to arrive)
+            max_concurrency: Maximum chunks of a large document processed at once
+            allow_partial: Keep the complete blocks of a response cut off at
+                max_tokens instead of failing (marked metadata['partial'])
+            rpm: Requests per minute allowed by the API key's rate limit (None: no limit)
+            tpm: Tokens per minute allowed by the API key's rate limit (None: no limit)
         """
         self.api_key = api_key or os.environ.get('ANTHROPIC_API_KEY')
         self.model = model
         self.max_tokens = max_tokens
         self.cache = ResponseCache(cache_dir) if enable_cache else None
+        self.use_batch = use_batch
+        self.max_concurrency = max(1, max_concurrency)
+        self.allow_partial = allow_partial
+        # Running token totals across all requests, including prompt-cache hits
+        self.token_usage = {name: 0 for name in self.USAGE_FIELDS}
+        self._usage_lock = threading.Lock()
+        self._rate_limiter = _TokenBucket(rpm, tpm)
         self._client = None
 
     @property
@@ -240,24 +548,33 @@ Return ONLY the JSON object, no other text.'''
         if self._client is None:
             try:
                 import anthropic
-                self._client = anthropic.Anthropic(api_key=self.api_key)
             except ImportError:
                 raise ClaudeProcessingError(
                     "anthropic package not installed. Run: pip install anthropic"
                 )
+            with _CLIENT_CACHE_LOCK:
+                client = _CLIENT_CACHE.get(self.api_key)
+                if client is None:
+                    client = _CLIENT_CACHE[self.api_key] = anthropic.Anthropic(api_key=self.api_key)
+            self._client = client
         return self._client
 
     def process_text(
         self,
         raw_text: str,
         gold_standard_template: str = None,
+        on_block: Optional[Callable[[StructuredBlock], None]] = None,
     ) -> DocumentStructure:
         """
         Process raw extracted text into structured document.
 
+        The response is streamed; with on_block set, each block is handed over
+        as soon as it has been generated, before the full response arrives.
+
         Args:
             raw_text: Raw text from pdftotext/OCR
             gold_standard_template: HTML template showing target format (optional)
+            on_block: Called with each StructuredBlock, in document order
 
         Returns:
             DocumentStructure with ordered, classified blocks
@@ -276,128 +593,525 @@ Return ONLY the JSON object, no other text.'''
             cached = self.cache.get(raw_text, self.PROMPT_VERSION)
             if cached:
                 logger.info("Using cached Claude response")
-                return self._parse_response(cached)
+                return self._emit_blocks(self._parse_response(cached), on_block)
 
         # Check if document needs chunking (very large documents)
         estimated_tokens = len(raw_text) // 4
         if estimated_tokens > 150000:
             logger.info(f"Large document ({estimated_tokens} est. tokens), processing in chunks")
-            return self._process_chunked(raw_text)
+            return self._emit_blocks(self._process_chunked(raw_text), on_block)
+
+        response_json = self._call_claude(raw_text, on_block)
+
+        # Cache successful response (a truncated one may succeed next time)
+        metadata = response_json.get('metadata')
+        partial = isinstance(metadata, dict) and metadata.get('partial')
+        if self.cache and not partial:
+            self.cache.set(raw_text, self.PROMPT_VERSION, response_json)
+
+        return self._parse_response(response_json)
+
+    def _call_claude(
+        self,
+        raw_text: str,
+        on_block: Optional[Callable[[StructuredBlock], None]] = None,
+    ) -> dict:
+        """
+        Send one piece of document text to Claude and return the response JSON.
+
+        No caching or chunking: callers have already decided this text is
+        sent as a single request.
+
+        Args:
+            raw_text: Raw text from pdftotext/OCR
+            on_block: Called with each StructuredBlock as it is streamed
 
-        # Build prompt
-        user_prompt = self.USER_PROMPT_TEMPLATE.format(raw_text=raw_text)
+        Returns:
+            Parsed response JSON
+        """
+        # Stream so blocks can be handed over as they complete
+        parser = _StreamingBlockParser() if on_block else None
+        parts = []
+        outcome = {}
+        self._rate_limiter.acquire(self._estimate_tokens(raw_text))
+        for text in self._stream_text(raw_text, outcome):
+            parts.append(text)
+            if parser:
+                for block_data in parser.feed(text):
+                    block = self._parse_block(block_data)
+                    if block:
+                        on_block(block)
+
+        return self._response_json(''.join(parts), outcome['truncated'])
+
+    def _stream_text(self, raw_text: str, outcome: dict) -> Iterator[str]:
+        """
+        Stream the response to one request, yielding its text as it arrives.
 
-        # Call Claude API
+        Only errors raised by the API client are mapped to processing errors;
+        an exception from the consumer (e.g. an on_block callback) closes the
+        stream and propagates unchanged.
+
+        Args:
+            raw_text: Raw text from pdftotext/OCR
+            outcome: Receives 'truncated', whether the response stopped at
+                max_tokens, once the stream is complete
+        """
         try:
-            import anthropic
+            with self.client.messages.stream(**self._build_request(raw_text)) as stream:
+                yield from stream.text_stream
+                final_message = stream.get_final_message()
+        except Exception as e:
+            raise self._api_error(e) from e
 
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                system=self.SYSTEM_PROMPT,
-                messages=[
-                    {"role": "user", "content": user_prompt}
-                ],
+        outcome['truncated'] = final_message.stop_reason == 'max_tokens'
+        self._record_usage(final_message.usage)
+
+    def _response_json(self, response_text: str, truncated: bool) -> dict:
+        """
+        Parse the JSON of one response to a document or chunk request.
+
+        With allow_partial, a response cut off at max_tokens keeps its
+        complete blocks and is marked metadata['partial'] rather than
+        failing to parse.
+
+        Args:
+            response_text: Full response text
+            truncated: Whether the response stopped at max_tokens
+
+        Returns:
+            Parsed response JSON
+        """
+        if truncated and self.allow_partial:
+            response_json = _repair_truncated_json(response_text)
+            if isinstance(response_json, dict) and isinstance(response_json.get('blocks'), list):
+                logger.warning(
+                    f"Response hit max_tokens; keeping {len(response_json['blocks'])} complete blocks"
+                )
+                if not isinstance(response_json.get('metadata'), dict):
+                    response_json['metadata'] = {}
+                response_json['metadata']['partial'] = True
+                return response_json
+
+        # Parse the complete response for the canonical result
+        return self._extract_json(response_text)
+
+    def _message_json(self, message) -> dict:
+        """Parse the JSON of a complete (non-streamed) Message."""
+        if not message.content:
+            raise ClaudeInvalidResponseError(
+                f"Empty response (stop reason: {message.stop_reason})"
             )
+        return self._response_json(
+            message.content[0].text, message.stop_reason == 'max_tokens'
+        )
+
+    @staticmethod
+    def _emit_blocks(
+        structure: DocumentStructure,
+        on_block: Optional[Callable[[StructuredBlock], None]],
+    ) -> DocumentStructure:
+        """Pass every block of an already complete structure to on_block."""
+        if on_block:
+            for block in structure.blocks:
+                on_block(block)
+        return structure
+
+    def _record_usage(self, usage) -> None:
+        """Add a response's token usage to token_usage and log prompt-cache hits."""
+        counts = {}
+        for name in self.USAGE_FIELDS:
+            value = getattr(usage, name, None)
+            counts[name] = value if isinstance(value, int) else 0
+
+        with self._usage_lock:
+            for name, value in counts.items():
+                self.token_usage[name] += value
+
+        logger.debug(
+            f"Claude usage: {counts['input_tokens']} input, "
+            f"{counts['cache_read_input_tokens']} cache read, "
+            f"{counts['cache_creation_input_tokens']} cache write, "
+            f"{counts['output_tokens']} output tokens"
+        )
+
+    def _estimate_tokens(self, raw_text: str) -> int:
+        """Rough token budget of a request: prompt text plus the response limit."""
+        return len(raw_text) // 4 + self.max_tokens
+
+    def _api_error(self, error: Exception) -> ClaudeProcessingError:
+        """Map an exception raised by the API client to a processing error."""
+        if isinstance(error, _rate_limit_errors()):
+            return ClaudeRateLimitError(f"Rate limit exceeded: {error}")
+        return ClaudeAPIError(f"API error: {error}")
+
+    def process_texts(self, raw_texts: List[str]) -> List[DocumentStructure]:
+        """
+        Process several documents, sending small ones together in one request.
+
+        Documents are grouped up to MAX_DOCS_PER_REQUEST at a time while their
+        combined size fits one response, so the system prompt and instructions
+        are paid for once per group. Documents too large to share a request,
+        or missing from a shared response, go through process_text.
+
+        Args:
+            raw_texts: Raw text of each document
+
+        Returns:
+            DocumentStructure per document, in the same order as raw_texts
+
+        Raises:
+            ClaudeProcessingError: On any processing failure
+        """
+        results: List[Optional[DocumentStructure]] = [None] * len(raw_texts)
+        budget = int(self.max_tokens * self.CHUNK_OUTPUT_FRACTION)
+
+        groups = []
+        group = []
+        group_tokens = 0
+        for index, raw_text in enumerate(raw_texts):
+            cached = self.cache.get(raw_text, self.PROMPT_VERSION) if self.cache else None
+            if cached:
+                results[index] = self._parse_response(cached)
+                continue
+
+            tokens = len(raw_text) // 4
+            if group and (
+                len(group) >= self.MAX_DOCS_PER_REQUEST or group_tokens + tokens > budget
+            ):
+                groups.append(group)
+                group, group_tokens = [], 0
+            group.append(index)
+            group_tokens += tokens
+        if group:
+            groups.append(group)
+
+        for group in groups:
+            responses = [None] * len(group)
+            if len(group) > 1 and self.api_key:
+                responses = self._process_group([raw_texts[i] for i in group])
+
+            for index, response_json in zip(group, responses):
+                if response_json is None:
+                    results[index] = self.process_text(raw_texts[index])
+                    continue
+                if self.cache:
+                    self.cache.set(raw_texts[index], self.PROMPT_VERSION, response_json)
+                results[index] = self._parse_response(response_json)
+
+        return results
+
+    def _process_group(self, raw_texts: List[str]) -> List[Optional[dict]]:
+        """
+        Send several documents in one request.
+
+        Args:
+            raw_texts: Raw text of each document
+
+        Returns:
+            Response JSON per document, or None where the response had no entry for it
+        """
+        document_text = '\n'.join(
+            f"## DOC {number} ##\n{raw_text}" for number, raw_text in enumerate(raw_texts, 1)
+        )
+        note = self.MULTI_DOCUMENT_NOTE.format(count=len(raw_texts))
+
+        logger.info(f"Processing {len(raw_texts)} documents in one request")
+        self._rate_limiter.acquire(self._estimate_tokens(document_text))
+        try:
+            response = self.client.messages.create(**self._build_request(document_text, note))
         except Exception as e:
-            error_str = str(e).lower()
-            if 'rate' in error_str and 'limit' in error_str:
-                raise ClaudeRateLimitError(f"Rate limit exceeded: {e}")
-            raise ClaudeAPIError(f"API error: {e}")
+            raise self._api_error(e) from e
+        self._record_usage(response.usage)
 
-        # Parse response
-        response_text = response.content[0].text
-        response_json = self._extract_json(response_text)
+        if not response.content:
+            logger.warning("Empty multi-document response, processing separately")
+            return [None] * len(raw_texts)
 
-        # Cache successful response
-        if self.cache:
-            self.cache.set(raw_text, self.PROMPT_VERSION, response_json)
+        try:
+            documents = self._extract_json(response.content[0].text, opening='[')
+        except ClaudeInvalidResponseError:
+            logger.warning("Could not parse multi-document response, processing separately")
+            return [None] * len(raw_texts)
+
+        results = [None] * len(raw_texts)
+        for document in documents if isinstance(documents, list) else []:
+            if not isinstance(document, dict):
+                continue
+            number = document.pop('doc_index', None)
+            if isinstance(number, int) and 1 <= number <= len(raw_texts) and 'blocks' in document:
+                results[number - 1] = document
+        return results
 
-        return self._parse_response(response_json)
+    def _build_request(self, raw_text: str, note: str = "") -> dict:
+        """
+        Build messages.create arguments for a piece of document text.
+
+        The system prompt and instructions are marked as prompt-cache
+        breakpoints, so repeated calls (e.g. chunks of one document) are
+        billed as cache reads for everything before the document text.
+
+        Args:
+            raw_text: Raw text from pdftotext/OCR
+            note: Extra instructions placed after the cached prefix
+
+        Returns:
+            Keyword arguments for client.messages.create
+        """
+        return dict(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            system=[{
+                "type": "text",
+                "text": self.SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }],
+            messages=[{
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": self.INSTRUCTIONS_PROMPT,
+                        "cache_control": {"type": "ephemeral"},
+                    },
+                    {
+                        "type": "text",
+                        "text": note + self.RAW_TEXT_HEADER,
+                    },
+                    # The document goes in its own block so the (possibly
+                    # multi-megabyte) text isn't copied into a larger string
+                    {
+                        "type": "text",
+                        "text": raw_text,
+                    },
+                ],
+            }],
+        )
 
     def _process_chunked(
         self,
         raw_text: str,
-        pages_per_chunk: int = 15,
+        max_chunk_tokens: Optional[int] = None,
     ) -> DocumentStructure:
         """
         Process large documents by chunking on page boundaries.
 
+        Pages are packed greedily into chunks of up to max_chunk_tokens
+        estimated tokens, so skewed page sizes neither overflow a chunk nor
+        leave chunks mostly empty.
+
         Args:
             raw_text: Raw text from pdftotext/OCR
-            pages_per_chunk: Number of pages per chunk
+            max_chunk_tokens: Estimated token budget per chunk (defaults to
+                CHUNK_OUTPUT_FRACTION of max_tokens)
 
         Returns:
             Merged DocumentStructure
         """
-        # Split on form feed characters (page breaks from pdftotext)
-        pages = raw_text.split('\f')
-
-        if len(pages) <= pages_per_chunk:
-            return self.process_text(raw_text)
-
-        logger.info(f"Document has {len(pages)} pages, processing in chunks of {pages_per_chunk}")
-
+        if max_chunk_tokens is None:
+            max_chunk_tokens = int(self.max_tokens * self.CHUNK_OUTPUT_FRACTION)
+
+        # Pack pages by offset and slice each chunk out of raw_text once,
+        # rather than splitting the whole document into page strings
+        chunks = []
+        chunk_start = None
+        chunk_end = 0
+        chunk_tokens = 0
+        page_count = 0
+        for start, end in self._iter_page_spans(raw_text):
+            page_count += 1
+            page_tokens = (end - start) // 4
+            if chunk_start is not None and chunk_tokens + page_tokens > max_chunk_tokens:
+                chunks.append(raw_text[chunk_start:chunk_end])
+                chunk_start = None
+            if chunk_start is None:
+                chunk_start, chunk_tokens = start, 0
+            chunk_end = end
+            chunk_tokens += page_tokens
+        chunks.append(raw_text[chunk_start:chunk_end])
+
+        if len(chunks) == 1:
+            return self._parse_response(self._call_claude(raw_text))
+
+        logger.info(f"Document has {page_count} pages, processing in {len(chunks)} chunks")
+
+        if self.use_batch:
+            chunk_results = self._process_chunks_batch(chunks)
+        elif self.max_concurrency > 1 and not self._in_event_loop():
+            chunk_results = asyncio.run(self._process_chunks_async(chunks))
+        else:
+            chunk_results = []
+            for chunk_num, chunk_text in enumerate(chunks, 1):
+                logger.info(f"Processing chunk {chunk_num}/{len(chunks)}")
+                chunk_results.append(self._parse_response(self._call_claude(chunk_text)))
+
+        # First chunk contains title, authors, abstract
+        first = chunk_results[0]
         all_blocks = []
-        title = None
-        authors = []
-        abstract = None
-        metadata = {}
-
-        for i in range(0, len(pages), pages_per_chunk):
-            chunk_pages = pages[i:i + pages_per_chunk]
-            chunk_text = '\f'.join(chunk_pages)
-
-            chunk_num = i // pages_per_chunk + 1
-            total_chunks = (len(pages) + pages_per_chunk - 1) // pages_per_chunk
-            logger.info(f"Processing chunk {chunk_num}/{total_chunks}")
-
-            # Process chunk (without caching individual chunks)
-            old_cache = self.cache
-            self.cache = None
-            try:
-                chunk_result = self.process_text(chunk_text)
-            finally:
-                self.cache = old_cache
-
-            # First chunk contains title, authors, abstract
-            if i == 0:
-                title = chunk_result.title
-                authors = chunk_result.authors
-                abstract = chunk_result.abstract
-                metadata = chunk_result.metadata
-
+        metadata = dict(first.metadata)
+        for chunk_result in chunk_results:
             all_blocks.extend(chunk_result.blocks)
+            if chunk_result.metadata.get('partial'):
+                metadata['partial'] = True
 
         return DocumentStructure(
-            title=title or "Untitled Document",
-            authors=authors,
-            abstract=abstract,
+            title=first.title or "Untitled Document",
+            authors=first.authors,
+            abstract=first.abstract,
             blocks=all_blocks,
             metadata=metadata,
         )
 
-    def _extract_json(self, response_text: str) -> dict:
-        """Extract and parse JSON from Claude's response."""
+    @staticmethod
+    def _iter_page_spans(raw_text: str) -> Iterator[tuple]:
+        """Yield (start, end) offsets of each page, split on form feeds (pdftotext page breaks)."""
+        start = 0
+        while True:
+            end = raw_text.find('\f', start)
+            if end == -1:
+                yield start, len(raw_text)
+                return
+            yield start, end
+            start = end + 1
+
+    @staticmethod
+    def _in_event_loop() -> bool:
+        """Whether the caller is already running inside an asyncio event loop."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+
+    async def _process_chunks_async(self, chunks: List[str]) -> List[DocumentStructure]:
+        """
+        Process document chunks concurrently, up to max_concurrency at a time.
+
+        Args:
+            chunks: Chunk texts, in document order
+
+        Returns:
+            DocumentStructure per chunk, in the same order as chunks
+        """
+        try:
+            import anthropic
+        except ImportError as e:
+            raise ClaudeProcessingError(
+                "anthropic package not installed. Run: pip install anthropic"
+            ) from e
+
+        logger.info(f"Processing {len(chunks)} chunks, {self.max_concurrency} at a time")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # The async client's connections belong to this event loop, so it is
+        # created and closed here rather than cached on the processor
+        async with anthropic.AsyncAnthropic(api_key=self.api_key) as client:
+            return await asyncio.gather(*(
+                self._process_chunk_async(client, semaphore, chunk_text)
+                for chunk_text in chunks
+            ))
+
+    async def _process_chunk_async(
+        self,
+        client,
+        semaphore: asyncio.Semaphore,
+        chunk_text: str,
+    ) -> DocumentStructure:
+        """
+        Process one chunk of a large document with the async client.
+
+        Args:
+            client: anthropic.AsyncAnthropic client
+            semaphore: Semaphore bounding concurrent requests
+            chunk_text: Raw text of the chunk
+
+        Returns:
+            DocumentStructure for the chunk
+        """
+        async with semaphore:
+            await self._rate_limiter.acquire_async(self._estimate_tokens(chunk_text))
+            try:
+                response = await client.messages.create(**self._build_request(chunk_text))
+            except Exception as e:
+                raise self._api_error(e) from e
+        self._record_usage(response.usage)
+
+        return self._parse_response(self._message_json(response))
+
+    def _process_chunks_batch(self, chunks: List[str]) -> List[DocumentStructure]:
+        """
+        Process document chunks as a single Message Batch.
+
+        Args:
+            chunks: Chunk texts, in document order
+
+        Returns:
+            DocumentStructure per chunk, in the same order as chunks
+
+        Raises:
+            ClaudeAPIError: If the batch or any of its requests fails
+        """
+        logger.info(f"Submitting {len(chunks)} chunks as a message batch")
+
+        try:
+            batch = self.client.messages.batches.create(requests=[
+                {"custom_id": f"chunk_{i}", "params": self._build_request(chunk_text)}
+                for i, chunk_text in enumerate(chunks)
+            ])
+
+            while batch.processing_status != "ended":
+                time.sleep(self.BATCH_POLL_INTERVAL)
+                batch = self.client.messages.batches.retrieve(batch.id)
+
+            responses = {}
+            for entry in self.client.messages.batches.results(batch.id):
+                if entry.result.type != "succeeded":
+                    raise ClaudeAPIError(
+                        f"Batch request {entry.custom_id} {entry.result.type}"
+                    )
+                responses[entry.custom_id] = entry.result.message
+                self._record_usage(entry.result.message.usage)
+        except ClaudeProcessingError:
+            raise
+        except Exception as e:
+            raise ClaudeAPIError(f"Batch API error: {e}") from e
+
+        # Results stream back in completion order; reorder by custom_id
+        results = []
+        for i in range(len(chunks)):
+            message = responses.get(f"chunk_{i}")
+            if message is None:
+                raise ClaudeAPIError(f"Batch returned no result for chunk_{i}")
+            results.append(self._parse_response(self._message_json(message)))
+        return results
+
+    def _extract_json(self, response_text: str, opening: str = '{') -> Any:
+        """
+        Extract and parse JSON from Claude's response.
+
+        Args:
+            response_text: Response text, possibly wrapped in fences or prose
+            opening: Character that starts the expected value ('{' or '[')
+        """
         # First try direct parsing
         try:
-            return json.loads(response_text)
+            return _json_loads(response_text)
         except json.JSONDecodeError:
             pass
 
-        # Try to extract JSON from markdown code block
-        json_match = re.search(r'```(?:json)?\s*([\s\S]*?)```', response_text)
-        if json_match:
-            try:
-                return json.loads(json_match.group(1))
-            except json.JSONDecodeError:
-                pass
+        # Skip any reasoning preamble, whose text may contain braces
+        text = response_text
+        thought_end = text.find('</thought>')
+        if thought_end != -1:
+            text = text[thought_end + len('</thought>'):]
 
-        # Try to find JSON object in response
-        json_match = re.search(r'\{[\s\S]*\}', response_text)
-        if json_match:
+        # Decode the value starting at the first brace; this skips a leading
+        # ```json fence or prose and ignores anything after the value
+        start = text.find(opening)
+        if start != -1:
             try:
-                return json.loads(json_match.group())
+                result, _ = _JSON_DECODER.raw_decode(text, start)
+                return result
             except json.JSONDecodeError:
                 pass
 
@@ -416,28 +1130,10 @@ Return ONLY the JSON object, no other text.'''
 
         # Parse blocks
         blocks = []
-        valid_types = {e.value for e in BlockType}
-
         for block_data in response.get('blocks', []):
-            block_type = block_data.get('block_type', 'paragraph')
-
-            # Validate or default block type
-            if block_type not in valid_types:
-                logger.warning(f"Unknown block type '{block_type}', defaulting to 'paragraph'")
-                block_type = 'paragraph'
-
-            content = block_data.get('content', '')
-            if not content:
-                continue
-
-            blocks.append(StructuredBlock(
-                block_type=block_type,
-                content=content,
-                heading_level=block_data.get('heading_level'),
-                section_number=block_data.get('section_number'),
-                reference_number=block_data.get('reference_number'),
-                id=block_data.get('id'),
-            ))
+            block = self._parse_block(block_data)
+            if block:
+                blocks.append(block)
 
         return DocumentStructure(
             title=response.get('title', 'Untitled Document'),
@@ -446,3 +1142,27 @@ Return ONLY the JSON object, no other text.'''
             blocks=blocks,
             metadata=response.get('metadata', {}),
         )
+
+    def _parse_block(self, block_data: dict) -> Optional[StructuredBlock]:
+        """Build a StructuredBlock from one block of the response, or None if empty."""
+        get = block_data.get
+
+        # Skip empty blocks before doing any other work on them
+        content = get('content')
+        if not content:
+            return None
+
+        # Validate or default block type
+        block_type = get('block_type', 'paragraph')
+        if block_type not in _VALID_BLOCK_TYPES:
+            logger.warning(f"Unknown block type '{block_type}', defaulting to 'paragraph'")
+            block_type = 'paragraph'
+
+        return StructuredBlock(
+            block_type=block_type,
+            content=content,
+            heading_level=get('heading_level'),
+            section_number=get('section_number'),
+            reference_number=get('reference_number'),
+            id=get('id'),
+        )
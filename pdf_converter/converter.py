@@ -8,10 +8,16 @@ Pipeline: PDF -> pdftotext (or OCR fallback) -> Claude Review -> Semantic HTML -
 """
 
 import html
+import io
+import os
 import re
 import logging
+import shutil
 import subprocess
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, lru_cache
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Optional, Tuple, TYPE_CHECKING
@@ -22,6 +28,64 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _escape_cell(cell) -> str:
+    """HTML-escape a table cell; numbers, units and blanks repeat a lot."""
+    return html.escape(str(cell).strip())
+
+
+@cache
+def _find_executable(name: str) -> str:
+    """Resolve a command to its absolute path, once per process."""
+    return shutil.which(name) or name
+
+
+def _run_command(args: list, **kwargs) -> subprocess.CompletedProcess:
+    """
+    Run a command-line tool and capture its output.
+
+    subprocess only launches with posix_spawn (no fork of this process's
+    address space) when given an absolute executable and close_fds=False.
+    Python opens its own descriptors non-inheritable, so none leak.
+    """
+    return subprocess.run(
+        [_find_executable(args[0]), *args[1:]],
+        capture_output=True,
+        close_fds=False,
+        **kwargs
+    )
+
+
+@lru_cache(maxsize=32)
+def _pdfinfo_page_count(pdf_path: str, mtime_ns: int, size: int) -> int:
+    """
+    Run pdfinfo once per file version; the stat fields key the cache.
+
+    Failures raise rather than return, so a transient one (e.g. a timeout)
+    isn't cached for the rest of the process.
+    """
+    result = _run_command(['pdfinfo', pdf_path], text=True, timeout=30)
+    for line in result.stdout.split('\n'):
+        if line.startswith('Pages:'):
+            return int(line.split(':')[1].strip())
+    raise ValueError(f"pdfinfo reported no page count: {result.stderr.strip()}")
+
+
+class _SlugTable(dict):
+    """
+    str.translate table for section ids: [a-z0-9] map to themselves and
+    everything else to '-'. Latin-1 is precomputed so the common case stays
+    in C; other code points fall back to __missing__.
+    """
+
+    def __init__(self):
+        keep = 'abcdefghijklmnopqrstuvwxyz0123456789'
+        super().__init__((i, chr(i) if chr(i) in keep else '-') for i in range(256))
+
+    def __missing__(self, codepoint: int) -> str:
+        return '-'
+
+
 @dataclass
 class TextBlock:
     """A block of text (paragraph, heading, etc.)."""
@@ -58,6 +122,148 @@ class PDFToAccessibleHTML:
     Claude AI is used to review text ordering and structure detection.
     """
 
+    # Blank lines that carry stray whitespace ("\n \n", "\n\f\n", "\r\n\r\n"),
+    # normalized to "\n\n" before paragraphs are split
+    WHITESPACE_BLANK_LINE_PATTERN = re.compile(r'\n[^\S\n]+\n')
+
+    # Heading glued to the start of its paragraph. The branches can't both
+    # match one text (they differ on the first or fourth character), so a
+    # single match attempt replaces trying each pattern in turn.
+    HEADING_SPLIT_PATTERN = re.compile(
+        r'^(?:'
+        # Roman numeral section: "I. INTRODUCTION Large language models..."
+        r'(?P<roman>[IVX]+\.\s+[A-Z][A-Z\s]+?)'
+        # Numbered or lettered section: "1. Title Paragraph text...",
+        # "A. Title Paragraph text..."
+        r'|(?P<section>(?:\d+|[A-Z])\.\s+[A-Z][a-z][^\n]{5,50})'
+        r')(?P<remainder>\s+[A-Z][a-z].+)$'
+    )
+
+    # Longest heading accepted from each HEADING_SPLIT_PATTERN branch
+    MAX_SPLIT_HEADING_LENGTH = {'roman': 100, 'section': 80}
+
+    # pdfplumber table detection from ruling lines only (its defaults, spelled
+    # out because the page skip in _extract_tables_with_pdfplumber relies on
+    # them); text-based strategies cluster every character and are far slower
+    TABLE_SETTINGS = {
+        'vertical_strategy': 'lines',
+        'horizontal_strategy': 'lines',
+        'snap_tolerance': 3,
+    }
+
+    # Fewest ruling edges that can enclose a table of two rows: three
+    # horizontal rules and two vertical ones. Pages with fewer are skipped
+    # before table detection runs.
+    TABLE_MIN_EDGES = 5
+
+    # OCR spacing fixes for section headers, applied in a single pass.
+    # The group that closes last holds the split word to rejoin.
+    SECTION_FIX_PATTERN = re.compile(
+        # Roman numeral and numbered sections: "II. D ISCUSSION" -> "II. DISCUSSION"
+        r'(?P<section>(?:[IVX]+|\d+)\.)\s+(?P<section_word>[A-Z]\s+[A-Z]+)'
+        # Lettered subsections: "A. R elated work" -> "A. Related work"
+        r'|(?P<letter>[A-Z]\.)\s+(?P<letter_word>[A-Z]\s+[a-z]+)'
+        # Split ALL CAPS words: "R EFERENCES" -> "REFERENCES"
+        r'|\b(?P<caps_word>[A-Z]\s+[A-Z]{2,})\b'
+    )
+
+    # Paragraph clean-up (_clean_paragraph)
+    PAGE_NUMBER_PATTERN = re.compile(r'^\d+\s*$')  # Standalone page numbers
+    # Any orphaned curly braces left by the footnote patterns
+    ORPHAN_BRACES_PATTERN = re.compile(r'\s*\{[^}]{0,20}\}\s*')
+
+    # Common footnote patterns that get mixed into text, removed in one pass.
+    # The "*...@..." footnote scans to the first '@' only; the matched span is
+    # the same, but a failed attempt no longer backtracks over every '@'.
+    FOOTNOTE_PATTERN = re.compile(
+        '|'.join(f'(?:{pattern})' for pattern in [
+            r'Contact emails follow the format [^.]+\.',
+            r'Corresponding author[^.]*\.',
+            r'Email:\s*[^\s]+@[^\s]+',
+            r'\*[^.@]*@[^.]*\.',
+            r'\dagger[^.]*\.',
+            # Handle split footnotes (line breaks in middle)
+            r'\{first\.[^}]*\}@[^\s.]+\.',
+            r'last\}@[^\s.]+\.',
+            r'first\.last\}@[^\s.]+\.',
+            r'@aalto\.fi\.?',
+            r'@[a-z]+\.(edu|fi|com|org)\.?',
+        ]),
+        re.IGNORECASE
+    )
+
+    # Orphaned domain fragments, often left behind by FOOTNOTE_PATTERN
+    # removals, so this runs as a second pass
+    ORPHAN_DOMAIN_PATTERN = re.compile(
+        r'\s+(?:fi|edu|com|org)\.(?=\s|$)', re.IGNORECASE
+    )
+
+    # Text that looks like a heading but isn't (_is_heading), searched as one
+    # alternation so each block is scanned once rather than once per pattern
+    NON_HEADING_PATTERN = re.compile(
+        '|'.join(f'(?:{pattern})' for pattern in [
+            r'^[A-Z][a-z]+\s+[A-Z][a-z]+$',  # "First Last" (author name)
+            r'^[A-Z][a-z]+\s+[A-Z][a-z]+\s+[A-Z][a-z]+$',  # "First Middle Last"
+            r'University',  # Affiliations
+            r'Institute',
+            r'Department',
+            r'College',
+            r'@',  # Email addresses
+            r'^Fig\.',  # Figure references
+            r'^Table',  # Table references
+            r'^\d+$',  # Just a number
+            r'^RY\s*\(',  # LaTeX/math notation artifacts
+            r'^RX\s*\(',
+            r'^RZ\s*\(',
+            r'^H[A-Z]{1,3}\s*\(',  # Math notation like "HRY (1.438)"
+            r'^\|[EV]\|',  # Math notation like "|E| X"
+            r'^[A-Z]\s+[A-Z]$',  # Single letter pairs like "H A"
+            r'^\[\d+\]',  # Reference citations
+            r'^M\.\s+Drame',  # Author names in references
+            r'^\d+\)\s+[A-Z]',  # Numbered list items that are too long
+        ]),
+        re.I
+    )
+
+    # Roman numeral (I., II., III.) and numbered (1., 2., 1.1) section headers
+    ROMAN_HEADING_PATTERN = re.compile(r'^[IVX]+\.\s+[A-Z]')
+    NUMBERED_HEADING_PATTERN = re.compile(r'^\d+(\.\d+)*\.?\s+[A-Z]')
+
+    # Common heading keywords, matched alone or after a section number
+    HEADING_KEYWORDS = frozenset([
+        'abstract', 'introduction', 'conclusion', 'references',
+        'acknowledgment', 'acknowledgement', 'appendix', 'bibliography',
+        'methods', 'methodology', 'results', 'discussion', 'background',
+        'related work', 'future work', 'evaluation', 'experiments',
+        'overview', 'summary', 'implementation', 'architecture',
+        'approach', 'contributions', 'limitations', 'fine-tuning pipeline'
+    ])
+    NUMBERED_KEYWORD_PATTERN = re.compile(
+        r'^[ivx\d]+\.?\s*(?:'
+        + '|'.join(re.escape(keyword) for keyword in sorted(HEADING_KEYWORDS))
+        + ')'
+    )
+
+    # Characters of section number prefixes (_get_heading_level)
+    ROMAN_NUMERALS = 'IVX'
+    DIGITS = '0123456789'
+
+    # Blocks that open with these are never the document title
+    TITLE_SKIP_PATTERNS = [
+        re.compile(pattern, re.I) for pattern in [
+            r'^Abstract',
+            r'^Keywords',
+            r'^Introduction',
+            r'^\d',
+            r'^arXiv:',
+            r'^Fig\.',
+            r'^Table',
+        ]
+    ]
+
+    # Characters outside [a-z0-9] become '-' in section ids
+    SLUG_TABLE = _SlugTable()
+
     def __init__(
         self,
         dpi: int = 300,
@@ -145,6 +351,10 @@ class PDFToAccessibleHTML:
         Returns:
             ConversionResult with success status and output path
         """
+        # pdftotext/pdfinfo (subprocesses) and pdfplumber table detection read
+        # the PDF independently, so they run alongside each other and alongside
+        # image extraction instead of one after another
+        executor = ThreadPoolExecutor(max_workers=3)
         try:
             pdf_path = Path(pdf_path)
 
@@ -158,8 +368,11 @@ class PDFToAccessibleHTML:
 
             logger.info(f"Converting PDF: {pdf_path}")
 
+            text_future = executor.submit(self._extract_with_pdftotext, str(pdf_path))
+            pages_future = executor.submit(self._count_pages, str(pdf_path))
+
             # 1. Try pdftotext first (best for born-digital PDFs)
-            raw_text = self._extract_with_pdftotext(str(pdf_path))
+            raw_text = text_future.result()
 
             # Check if we got meaningful text
             if len(raw_text.strip()) < 100:
@@ -172,9 +385,21 @@ class PDFToAccessibleHTML:
                     error="No text extracted from PDF"
                 )
 
+            # Parse tables while the images are extracted; only once the text
+            # is known to be usable, so the early return above has no table
+            # parse left to wait for
+            tables_future = executor.submit(self._extract_tables_with_pdfplumber, str(pdf_path))
+
             # Count words from raw text
             total_words = len(raw_text.split())
 
+            # Save extracted text for Claude Code review workflow while the
+            # images are extracted; the artifact writes below are independent
+            text_output_path = output_dir / f"{pdf_path.stem}_extracted.txt"
+            text_saved = executor.submit(
+                text_output_path.write_text, raw_text, encoding='utf-8'
+            )
+
             # 2. Extract images from PDF (if enabled)
             images_extracted = 0
             images_with_alt_text = 0
@@ -185,25 +410,33 @@ class PDFToAccessibleHTML:
                     self._extract_and_process_images(str(pdf_path), raw_text[:1000])
 
             # 3. Extract tables using pdfplumber
-            extracted_tables = self._extract_tables_with_pdfplumber(str(pdf_path))
-            tables_dir = None
+            extracted_tables = tables_future.result()
+            tables_saved = None
             if extracted_tables:
-                tables_dir = self._save_tables_for_review(
+                tables_saved = executor.submit(
+                    self._save_tables_for_review,
                     extracted_tables, output_dir, pdf_path.stem
                 )
-                logger.info(f"Extracted {len(extracted_tables)} tables to: {tables_dir}")
-
-            # 4. Structure the text - Save extracted text for Claude Code review workflow
-            text_output_path = output_dir / f"{pdf_path.stem}_extracted.txt"
-            text_output_path.write_text(raw_text, encoding='utf-8')
-            logger.info(f"Extracted text saved to: {text_output_path}")
 
-            # Save extracted images for incorporation during review
-            images_dir = None
+            # 4. Save extracted images for incorporation during review
+            images_saved = None
             if extracted_images:
-                images_dir = self._save_images_for_review(
+                images_saved = executor.submit(
+                    self._save_images_for_review,
                     extracted_images, output_dir, pdf_path.stem
                 )
+
+            text_saved.result()
+            logger.info(f"Extracted text saved to: {text_output_path}")
+
+            tables_dir = None
+            if tables_saved:
+                tables_dir = tables_saved.result()
+                logger.info(f"Extracted {len(extracted_tables)} tables to: {tables_dir}")
+
+            images_dir = None
+            if images_saved:
+                images_dir = images_saved.result()
                 logger.info(f"Extracted {len(extracted_images)} images to: {images_dir}")
 
             logger.info("="*60)
@@ -220,7 +453,7 @@ class PDFToAccessibleHTML:
             return ConversionResult(
                 success=True,
                 html_path=str(text_output_path),
-                pages_processed=self._count_pages(str(pdf_path)),
+                pages_processed=pages_future.result(),
                 total_words=total_words,
                 title=f"[EXTRACTED] {pdf_path.stem}",
                 images_extracted=images_extracted,
@@ -286,7 +519,7 @@ class PDFToAccessibleHTML:
             return ConversionResult(
                 success=True,
                 html_path=str(output_path),
-                pages_processed=self._count_pages(str(pdf_path)),
+                pages_processed=pages_future.result(),
                 total_words=total_words,
                 title=title,
                 images_extracted=images_extracted,
@@ -302,60 +535,99 @@ class PDFToAccessibleHTML:
                 success=False,
                 error=str(e)
             )
+        finally:
+            # Drop queued work whose result isn't needed, and wait for any
+            # still running so no worker thread outlives the conversion
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def _extract_with_pdftotext(self, pdf_path: str) -> str:
         """Extract text using pdftotext (without -layout for proper reading order)."""
         try:
             # Note: Do NOT use -layout flag for multi-column documents
-            # Without -layout, pdftotext reads columns in proper order
-            result = subprocess.run(
-                ['pdftotext', pdf_path, '-'],
-                capture_output=True,
-                text=True,
+            # Without -layout, pdftotext reads columns in proper order.
+            # Ask for UTF-8 explicitly and decode the captured bytes once,
+            # rather than relying on the locale's text-mode decoding.
+            result = _run_command(
+                ['pdftotext', '-enc', 'UTF-8', pdf_path, '-'],
                 timeout=120
             )
-            return result.stdout
+            return result.stdout.decode('utf-8', errors='replace')
         except (subprocess.TimeoutExpired, FileNotFoundError) as e:
             logger.warning(f"pdftotext failed: {e}")
             return ""
 
     def _extract_with_ocr(self, pdf_path: str) -> str:
-        """Fallback: Extract text using OCR."""
-        try:
-            from pdf2image import convert_from_path
-            import pytesseract
+        """Fallback: Extract text using OCR, several pages at a time."""
+        from .alt_text_generator import ocr_thread_limit
+
+        # Pages are recognized several at a time, so each tesseract stays
+        # single-threaded while tesserocr loads and pytesseract spawns it
+        with ocr_thread_limit():
+            # Prefer in-process tesserocr, fall back to pytesseract (which spawns
+            # a tesseract subprocess per page)
+            tess_apis = []
+            try:
+                from pdf2image import convert_from_path
+                try:
+                    import tesserocr
+                except ImportError:
+                    tesserocr = None
+                    import pytesseract
+
+                page_count = self._count_pages(pdf_path)
+                if not page_count:
+                    return ""
+
+                # Pages are rendered by pdftoppm and recognized by tesseract, which
+                # release the GIL, so threads keep every core busy
+                thread_state = threading.local()
+
+                def recognize(image) -> str:
+                    if tesserocr is None:
+                        return pytesseract.image_to_string(image, lang=self.lang, config='--psm 1')
+
+                    # One long-lived API per worker thread keeps the language
+                    # model loaded; PSM.AUTO_OSD matches pytesseract's '--psm 1'
+                    api = getattr(thread_state, 'api', None)
+                    if api is None:
+                        api = tesserocr.PyTessBaseAPI(lang=self.lang, psm=tesserocr.PSM.AUTO_OSD)
+                        thread_state.api = api
+                        tess_apis.append(api)
+                    api.SetImage(image)
+                    return api.GetUTF8Text()
+
+                def ocr_page(page_number: int) -> str:
+                    images = convert_from_path(
+                        pdf_path,
+                        dpi=self.dpi,
+                        first_page=page_number,
+                        last_page=page_number
+                    )
+                    return '\n\n'.join(recognize(image) for image in images)
 
-            images = convert_from_path(pdf_path, dpi=self.dpi)
-            text_parts = []
+                workers = min(os.cpu_count() or 1, page_count)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    text_parts = list(executor.map(ocr_page, range(1, page_count + 1)))
 
-            for image in images:
-                text = pytesseract.image_to_string(
-                    image,
-                    lang=self.lang,
-                    config='--psm 1'
-                )
-                text_parts.append(text)
-
-            return '\n\n'.join(text_parts)
-        except Exception as e:
-            logger.error(f"OCR failed: {e}")
-            return ""
+                return '\n\n'.join(text_parts)
+            except Exception as e:
+                logger.error(f"OCR failed: {e}")
+                return ""
+            finally:
+                for api in tess_apis:
+                    api.End()
 
     def _count_pages(self, pdf_path: str) -> int:
-        """Count pages in PDF."""
+        """Count pages in PDF (cached until the file changes)."""
         try:
-            result = subprocess.run(
-                ['pdfinfo', pdf_path],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            for line in result.stdout.split('\n'):
-                if line.startswith('Pages:'):
-                    return int(line.split(':')[1].strip())
-        except Exception:
-            pass
-        return 0
+            stat = os.stat(pdf_path)
+        except OSError:
+            return 0
+        try:
+            return _pdfinfo_page_count(pdf_path, stat.st_mtime_ns, stat.st_size)
+        except Exception as e:
+            logger.debug(f"Could not count pages: {e}")
+            return 0
 
     def _extract_and_process_images(
         self,
@@ -409,12 +681,17 @@ class PDFToAccessibleHTML:
             alt_gen = AltTextGenerator(
                 api_key=api_key,
                 use_ai=self.use_ai_alt_text and api_key is not None,
-                use_ocr_fallback=True
+                use_ocr_fallback=True,
+                enable_cache=self._claude_config.get('enable_cache', True),
             )
 
-            for img in images:
-                result = alt_gen.generate(img, context)
-                if result.success and result.alt_text:
+            # Requests run concurrently inside the generator; results come
+            # back in order and are applied here on the calling thread
+            results = alt_gen.generate_batch(images, context)
+            for img, result in zip(images, results):
+                if result.source == 'decorative':
+                    img.is_decorative = True
+                elif result.success and result.alt_text:
                     img.alt_text = result.alt_text
                     img.long_description = result.long_description
                     images_with_alt_text += 1
@@ -451,8 +728,9 @@ class PDFToAccessibleHTML:
         images_dir = output_dir / f"{pdf_stem}_images"
         images_dir.mkdir(parents=True, exist_ok=True)
 
-        # Save each image and build metadata
+        # Name each image and build metadata
         metadata = []
+        filenames = []
         for idx, img in enumerate(images):
             # Determine file extension
             ext = img.format if img.format else 'png'
@@ -460,10 +738,7 @@ class PDFToAccessibleHTML:
                 ext = 'jpg'
 
             filename = f"image_{idx + 1}_page_{img.page}.{ext}"
-            filepath = images_dir / filename
-
-            # Save image data
-            filepath.write_bytes(img.data)
+            filenames.append(filename)
 
             # Build metadata entry
             metadata.append({
@@ -474,14 +749,22 @@ class PDFToAccessibleHTML:
                 'caption': img.nearby_caption or '',
                 'alt_text': img.alt_text or '',
                 'long_description': img.long_description or '',
+                'decorative': img.is_decorative,
             })
 
-        # Save metadata JSON
+        # Save image data; many small independent writes, so overlap them
+        def write_image(filename: str, img) -> None:
+            (images_dir / filename).write_bytes(img.data)
+
+        with ThreadPoolExecutor(max_workers=min(8, len(images) or 1)) as executor:
+            # list() surfaces any write error
+            list(executor.map(write_image, filenames, images))
+
+        # Save metadata JSON, encoded straight into the file in chunks
+        # rather than built up as one string first
         metadata_path = images_dir / 'images_metadata.json'
-        metadata_path.write_text(
-            json.dumps(metadata, indent=2),
-            encoding='utf-8'
-        )
+        with metadata_path.open('w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
 
         return images_dir
 
@@ -501,7 +784,16 @@ class PDFToAccessibleHTML:
 
             with pdfplumber.open(pdf_path) as pdf:
                 for page_num, page in enumerate(pdf.pages, 1):
-                    page_tables = page.extract_tables()
+                    # Line-based detection can't find a table on a page
+                    # without enough rules or boxes to form one
+                    page_tables = None
+                    if len(page.edges) >= self.TABLE_MIN_EDGES:
+                        page_tables = page.extract_tables(self.TABLE_SETTINGS)
+
+                    # The cell text is plain lists by now; drop the page's
+                    # parsed objects so only one page's layout stays in memory
+                    page.close()
+
                     if not page_tables:
                         continue
 
@@ -510,14 +802,16 @@ class PDFToAccessibleHTML:
                         if not table or len(table) < 2:
                             continue
 
-                        # Filter out None values and empty strings
-                        cleaned_table = []
-                        for row in table:
-                            if row:
-                                cleaned_row = [cell if cell else '' for cell in row]
-                                # Only include rows that have at least some content
-                                if any(cell.strip() for cell in cleaned_row):
-                                    cleaned_table.append(cleaned_row)
+                        # Filter out None values and empty strings, keeping
+                        # only rows that have at least some content
+                        cleaned_table = [
+                            cleaned_row
+                            for cleaned_row in (
+                                [cell if cell else '' for cell in row]
+                                for row in table if row
+                            )
+                            if any(cell.strip() for cell in cleaned_row)
+                        ]
 
                         if len(cleaned_table) < 2:
                             continue
@@ -572,39 +866,32 @@ class PDFToAccessibleHTML:
             HTML string for the table
         """
         table_id = f"table-p{page_num}-{table_idx}"
+        escape = _escape_cell
 
-        html_parts = [
-            f'<table id="{table_id}" class="extracted-table">',
-            f'  <caption>Table from page {page_num}</caption>',
-            '  <thead>',
-            '    <tr>',
-        ]
-
-        # Add header cells with scope
-        for header in headers:
-            escaped_header = html.escape(str(header).strip())
-            html_parts.append(f'      <th scope="col">{escaped_header}</th>')
-
-        html_parts.extend([
-            '    </tr>',
-            '  </thead>',
-            '  <tbody>',
-        ])
-
-        # Add data rows
-        for row in rows:
-            html_parts.append('    <tr>')
-            for cell in row:
-                escaped_cell = html.escape(str(cell).strip())
-                html_parts.append(f'      <td>{escaped_cell}</td>')
-            html_parts.append('    </tr>')
-
-        html_parts.extend([
-            '  </tbody>',
-            '</table>',
-        ])
+        # Each cell carries its own leading newline so empty rows and tables
+        # keep the same layout as the surrounding skeleton
+        header_cells = ''.join(
+            f'\n      <th scope="col">{escape(header)}</th>'
+            for header in headers
+        )
+        body_rows = ''.join(
+            '\n    <tr>'
+            + ''.join(f'\n      <td>{escape(cell)}</td>' for cell in row)
+            + '\n    </tr>'
+            for row in rows
+        )
 
-        return '\n'.join(html_parts)
+        return (
+            f'<table id="{table_id}" class="extracted-table">\n'
+            f'  <caption>Table from page {page_num}</caption>\n'
+            f'  <thead>\n'
+            f'    <tr>{header_cells}\n'
+            f'    </tr>\n'
+            f'  </thead>\n'
+            f'  <tbody>{body_rows}\n'
+            f'  </tbody>\n'
+            f'</table>'
+        )
 
     def _save_tables_for_review(
         self,
@@ -629,12 +916,10 @@ class PDFToAccessibleHTML:
         tables_dir = output_dir / f"{pdf_stem}_tables"
         tables_dir.mkdir(parents=True, exist_ok=True)
 
-        # Save metadata JSON
+        # Save metadata JSON (streamed; each table carries its full HTML)
         metadata_path = tables_dir / 'tables_metadata.json'
-        metadata_path.write_text(
-            json.dumps(tables, indent=2, ensure_ascii=False),
-            encoding='utf-8'
-        )
+        with metadata_path.open('w', encoding='utf-8') as f:
+            json.dump(tables, f, indent=2, ensure_ascii=False)
 
         # Also save individual HTML files for each table
         for table in tables:
@@ -657,60 +942,40 @@ class PDFToAccessibleHTML:
         if not images:
             return html_content
 
-        try:
-            from bs4 import BeautifulSoup
-
-            soup = BeautifulSoup(html_content, 'html.parser')
-            main = soup.find('main') or soup.find('body')
-
-            if not main:
-                return html_content
-
-            # Find or create a figures section at the end of main
-            # We'll append figures there
-            for idx, img in enumerate(images):
-                figure = soup.new_tag('figure')
-                figure['id'] = f'extracted-figure-{idx + 1}'
-                figure['class'] = 'extracted-image'
-
-                # Create img tag with base64 data
-                img_tag = soup.new_tag('img')
-                img_tag['src'] = img.data_uri
-                img_tag['alt'] = img.alt_text or f'Figure from page {img.page}'
-                img_tag['loading'] = 'lazy'
-                img_tag['width'] = img.width
-                img_tag['height'] = img.height
-
-                figure.append(img_tag)
-
-                # Create figcaption
-                figcaption = soup.new_tag('figcaption')
-                caption_text = img.nearby_caption or f'Figure {idx + 1}'
-
-                # If we have a long description, add expandable details
-                if img.long_description and img.long_description != img.alt_text:
-                    figcaption.string = caption_text
-                    details = soup.new_tag('details')
-                    summary = soup.new_tag('summary')
-                    summary.string = 'Image description'
-                    details.append(summary)
-
-                    desc_p = soup.new_tag('p')
-                    desc_p.string = img.long_description
-                    details.append(desc_p)
-
-                    figcaption.append(details)
-                else:
-                    figcaption.string = caption_text
+        # Splice the figures in before the closing tag as text; parsing and
+        # re-serializing the whole document isn't needed to append to it
+        insert_at = html_content.rfind('</main>')
+        if insert_at == -1:
+            insert_at = html_content.rfind('</body>')
+        if insert_at == -1:
+            return html_content
+
+        escape = html.escape
+        figures = []
+        for idx, img in enumerate(images):
+            if img.is_decorative:
+                alt_attrs = 'alt="" role="presentation"'
+            else:
+                alt_text = img.alt_text or f'Figure from page {img.page}'
+                alt_attrs = f'alt="{escape(alt_text)}"'
 
-                figure.append(figcaption)
-                main.append(figure)
+            caption_text = escape(img.nearby_caption or f'Figure {idx + 1}', quote=False)
 
-            return str(soup)
+            # If we have a long description, add expandable details
+            if img.long_description and img.long_description != img.alt_text:
+                caption_text += (
+                    '<details><summary>Image description</summary>'
+                    f'<p>{escape(img.long_description, quote=False)}</p></details>'
+                )
 
-        except Exception as e:
-            logger.error(f"Failed to embed images: {e}")
-            return html_content
+            figures.append(
+                f'<figure id="extracted-figure-{idx + 1}" class="extracted-image">'
+                f'<img src="{escape(img.as_data_uri())}" {alt_attrs} loading="lazy" '
+                f'width="{img.width}" height="{img.height}"/>'
+                f'<figcaption>{caption_text}</figcaption></figure>'
+            )
+
+        return html_content[:insert_at] + ''.join(figures) + html_content[insert_at:]
 
     def _structure_text(self, raw_text: str) -> List[TextBlock]:
         """Structure raw text into paragraphs and headings."""
@@ -720,14 +985,19 @@ class PDFToAccessibleHTML:
         # "I. I NTRODUCTION" -> "I. INTRODUCTION"
         raw_text = self._fix_section_headers(raw_text)
 
-        # Split into paragraphs (blank lines separate paragraphs)
-        paragraphs = re.split(r'\n\s*\n', raw_text)
+        # Split into paragraphs (blank lines separate paragraphs). Runs of
+        # three or more newlines leave empty or newline-led pieces, which
+        # _clean_paragraph reduces to the same text (or drops).
+        raw_text = self.WHITESPACE_BLANK_LINE_PATTERN.sub('\n\n', raw_text)
+        paragraphs = raw_text.split('\n\n')
 
         for para in paragraphs:
-            # Clean up the paragraph
+            # Clean up the paragraph. The result is stripped with single
+            # spaces between words, which the heading checks below rely on
+            # instead of re-normalizing the text themselves.
             text = self._clean_paragraph(para)
 
-            if not text or len(text) < 5:
+            if len(text) < 5:
                 continue
 
             # Try to split heading from paragraph if combined
@@ -764,66 +1034,37 @@ class PDFToAccessibleHTML:
 
         Returns (heading, remainder) or (None, None) if not a combined block.
         """
-        # Pattern: Roman numeral section followed by content
-        # "I. INTRODUCTION Large language models..." -> ("I. INTRODUCTION", "Large language models...")
-        match = re.match(
-            r'^([IVX]+\.\s+[A-Z][A-Z\s]+?)(\s+[A-Z][a-z].+)$',
-            text
-        )
+        match = self.HEADING_SPLIT_PATTERN.match(text)
         if match:
-            heading = match.group(1).strip()
-            remainder = match.group(2).strip()
+            branch = 'roman' if match.group('roman') else 'section'
+            heading = match.group(branch).strip()
+            remainder = match.group('remainder').strip()
             # Verify the heading part looks valid
-            if len(heading) < 100 and len(remainder) > 50:
-                return heading, remainder
-
-        # Pattern: Numbered section "1. Title Paragraph text..."
-        match = re.match(
-            r'^(\d+\.\s+[A-Z][a-z][^\n]{5,50})(\s+[A-Z][a-z].+)$',
-            text
-        )
-        if match:
-            heading = match.group(1).strip()
-            remainder = match.group(2).strip()
-            if len(heading) < 80 and len(remainder) > 50:
-                return heading, remainder
-
-        # Pattern: Lettered subsection "A. Title Paragraph text..."
-        match = re.match(
-            r'^([A-Z]\.\s+[A-Z][a-z][^\n]{5,50})(\s+[A-Z][a-z].+)$',
-            text
-        )
-        if match:
-            heading = match.group(1).strip()
-            remainder = match.group(2).strip()
-            if len(heading) < 80 and len(remainder) > 50:
+            if len(heading) < self.MAX_SPLIT_HEADING_LENGTH[branch] and len(remainder) > 50:
                 return heading, remainder
 
         return None, None
 
     def _fix_section_headers(self, text: str) -> str:
         """Fix common OCR spacing issues in section headers."""
-        # Fix "I. I NTRODUCTION" -> "I. INTRODUCTION" pattern
-        # Matches Roman numeral + period + space + split word
-        section_fixes = [
-            # Roman numeral sections with split words
-            (r'([IVX]+\.)\s+([A-Z])\s+([A-Z]+)', r'\1 \2\3'),
-            # "II. D ISCUSSION" -> "II. DISCUSSION"
-            (r'([IVX]+\.)\s+([A-Z])\s+([A-Z][A-Z]+)', r'\1 \2\3'),
-            # Numbered sections "1. I NTRODUCTION" -> "1. INTRODUCTION"
-            (r'(\d+\.)\s+([A-Z])\s+([A-Z]+)', r'\1 \2\3'),
-            # Fix "A. R elated work" -> "A. Related work"
-            (r'([A-Z]\.)\s+([A-Z])\s+([a-z]+)', r'\1 \2\3'),
-            # Fix split ALL CAPS words: "R EFERENCES" -> "REFERENCES"
-            (r'\b([A-Z])\s+([A-Z]{3,})\b', r'\1\2'),
-            # Fix "Q UANTUM" -> "QUANTUM"
-            (r'\b([A-Z])\s+([A-Z][A-Z]+)\b', r'\1\2'),
-        ]
-
-        for pattern, replacement in section_fixes:
-            text = re.sub(pattern, replacement, text)
-
-        return text
+        return self.SECTION_FIX_PATTERN.sub(self._join_section_fix, text)
+
+    @classmethod
+    def _slugify(cls, text_lower: str) -> str:
+        """Build a section id from lower-cased heading text."""
+        # One C-level pass replaces every disallowed character; collapsing
+        # the resulting runs of '-' matches the old [^a-z0-9]+ substitution
+        slug = text_lower.translate(cls.SLUG_TABLE)
+        while '--' in slug:
+            slug = slug.replace('--', '-')
+        return slug[:50].strip('-')
+
+    @staticmethod
+    def _join_section_fix(match: re.Match) -> str:
+        """Rejoin the split word of a SECTION_FIX_PATTERN match."""
+        prefix = match.group('section') or match.group('letter')
+        word = ''.join(match.group(match.lastgroup).split())
+        return f'{prefix} {word}' if prefix else word
 
     def _clean_paragraph(self, text: str) -> str:
         """Clean up a paragraph of text."""
@@ -832,8 +1073,8 @@ class PDFToAccessibleHTML:
         cleaned_lines = []
 
         for line in lines:
-            # Collapse multiple spaces
-            line = re.sub(r'  +', ' ', line).strip()
+            # Collapse runs of whitespace (split() also strips the ends)
+            line = ' '.join(line.split())
             if line:
                 cleaned_lines.append(line)
 
@@ -849,135 +1090,122 @@ class PDFToAccessibleHTML:
         text = ''.join(result).strip()
 
         # Remove page numbers and headers/footers (common patterns)
-        text = re.sub(r'^\d+\s*$', '', text)  # Standalone page numbers
+        text = self.PAGE_NUMBER_PATTERN.sub('', text)  # Standalone page numbers
 
         # Remove common footnote patterns that get mixed into text
-        footnote_patterns = [
-            r'Contact emails follow the format [^.]+\.',
-            r'Corresponding author[^.]*\.',
-            r'Email:\s*[^\s]+@[^\s]+',
-            r'\*[^.]*@[^.]*\.',
-            r'\dagger[^.]*\.',
-            # Handle split footnotes (line breaks in middle)
-            r'\{first\.[^}]*\}@[^\s.]+\.',
-            r'last\}@[^\s.]+\.',
-            r'first\.last\}@[^\s.]+\.',
-            r'@aalto\.fi\.?',
-            r'@[a-z]+\.(edu|fi|com|org)\.?',
-            # Clean up orphaned domain fragments
-            r'\s+(fi|edu|com|org)\.\s*$',
-            r'\s+(fi|edu|com|org)\.\s+',
-        ]
-        for pattern in footnote_patterns:
-            text = re.sub(pattern, ' ', text, flags=re.IGNORECASE)
+        text = self.FOOTNOTE_PATTERN.sub(' ', text)
+        text = self.ORPHAN_DOMAIN_PATTERN.sub(' ', text)
 
-        # Clean up any orphaned curly braces from removed patterns
-        text = re.sub(r'\s*\{[^}]{0,20}\}\s*', ' ', text)
+        # Clean up any orphaned curly braces from removed patterns. Most
+        # paragraphs have none, and the leading \s* would otherwise be tried
+        # at every whitespace position.
+        if '{' in text:
+            text = self.ORPHAN_BRACES_PATTERN.sub(' ', text)
 
         # Normalize multiple spaces
-        text = re.sub(r'\s+', ' ', text)
-
-        return text.strip()
+        return ' '.join(text.split())
 
     def _is_heading(self, text: str) -> bool:
-        """Detect if text is a heading."""
-        text = text.strip()
+        """
+        Detect if text is a heading.
+
+        Expects text normalized by _clean_paragraph (stripped, single spaces).
+        """
+        length = len(text)
 
         # Too long for a heading
-        if len(text) > 200:
+        if length > 200:
             return False
 
         # Too short - likely just a label or fragment
-        if len(text) < 5:
+        if length < 5:
+            return False
+
+        # Email addresses (also covered by NON_HEADING_PATTERN, but a
+        # substring test is cheaper)
+        if '@' in text:
+            return False
+
+        # Every positive check below needs a section number prefix, ALL CAPS
+        # or a keyword. Most body text has none of these and is rejected
+        # here without running any regex.
+        text_lower = text.lower()
+        first = text_lower[0]
+        numbered = first.isdecimal() or first in 'ivx'
+        all_caps = length < 100 and ' ' in text and text.isupper()
+        keyword = text_lower in self.HEADING_KEYWORDS
+        if not (numbered or all_caps or keyword):
             return False
 
         # Exclude common non-heading patterns
         # Author names (typically 2-3 words, personal names)
         # University/affiliation lines
-        non_heading_patterns = [
-            r'^[A-Z][a-z]+\s+[A-Z][a-z]+$',  # "First Last" (author name)
-            r'^[A-Z][a-z]+\s+[A-Z][a-z]+\s+[A-Z][a-z]+$',  # "First Middle Last"
-            r'University',  # Affiliations
-            r'Institute',
-            r'Department',
-            r'College',
-            r'@',  # Email addresses
-            r'^Fig\.',  # Figure references
-            r'^Table',  # Table references
-            r'^\d+$',  # Just a number
-            r'^RY\s*\(',  # LaTeX/math notation artifacts
-            r'^RX\s*\(',
-            r'^RZ\s*\(',
-            r'^H[A-Z]{1,3}\s*\(',  # Math notation like "HRY (1.438)"
-            r'^\|[EV]\|',  # Math notation like "|E| X"
-            r'^[A-Z]\s+[A-Z]$',  # Single letter pairs like "H A"
-            r'^\[\d+\]',  # Reference citations
-            r'^M\.\s+Drame',  # Author names in references
-            r'^\d+\)\s+[A-Z]',  # Numbered list items that are too long
-        ]
-        for pattern in non_heading_patterns:
-            if re.search(pattern, text, re.I):
-                return False
-
-        # Roman numeral section headers (I., II., III., etc.)
-        if re.match(r'^[IVX]+\.\s+[A-Z]', text):
-            return True
-
-        # Numbered sections (1., 2., 1.1, etc.)
-        if re.match(r'^\d+(\.\d+)*\.?\s+[A-Z]', text):
-            return True
+        if self.NON_HEADING_PATTERN.search(text):
+            return False
 
-        # ALL CAPS text that's not too long and has multiple words
-        if text.isupper() and len(text) < 100 and len(text.split()) >= 2:
+        # ALL CAPS text that's not too long and has multiple words, or a
+        # common heading keyword on its own
+        if all_caps or keyword:
             return True
 
-        # Common heading keywords (alone or with numbering)
-        heading_keywords = [
-            'abstract', 'introduction', 'conclusion', 'references',
-            'acknowledgment', 'acknowledgement', 'appendix', 'bibliography',
-            'methods', 'methodology', 'results', 'discussion', 'background',
-            'related work', 'future work', 'evaluation', 'experiments',
-            'overview', 'summary', 'implementation', 'architecture',
-            'approach', 'contributions', 'limitations', 'fine-tuning pipeline'
-        ]
-        text_lower = text.lower().strip()
-
-        for keyword in heading_keywords:
-            # Exact match or with section number
-            if text_lower == keyword:
+        if numbered:
+            # Roman numeral section headers (I., II., III., etc.)
+            if self.ROMAN_HEADING_PATTERN.match(text):
                 return True
-            if re.match(rf'^[ivx\d]+\.?\s*{keyword}', text_lower):
+
+            # Numbered sections (1., 2., 1.1, etc.)
+            if self.NUMBERED_HEADING_PATTERN.match(text):
                 return True
 
+            # Keyword with section number ("1. introduction", "iv. results")
+            return bool(self.NUMBERED_KEYWORD_PATTERN.match(text_lower))
+
         return False
 
     def _get_heading_level(self, text: str) -> int:
-        """Determine heading level from text."""
-        text = text.strip()
+        """
+        Determine heading level from text.
+
+        Expects text normalized by _clean_paragraph (stripped, single spaces).
+        """
+        if not text:
+            return 2
+
+        # The section number prefix is read character by character; these
+        # checks run for every heading, and a few comparisons beat a regex
+        # match per level.
 
-        # Roman numeral main sections -> h2
-        if re.match(r'^[IVX]+\.\s+', text):
+        # Roman numeral main sections ("IV. ") -> h2
+        rest = text.lstrip(self.ROMAN_NUMERALS)
+        if len(rest) < len(text) and rest[:1] == '.' and rest[1:2].isspace():
             return 2
 
         # ALL CAPS -> h2
         if text.isupper():
             return 2
 
-        # Lettered subsections (A., B.) -> h3
-        if re.match(r'^[A-Z]\.\s+', text):
+        # Lettered subsections ("A. ", "B. ") -> h3
+        if 'A' <= text[0] <= 'Z' and text[1:2] == '.' and text[2:3].isspace():
             return 3
 
-        # Numbered main sections (1., 2.) -> h2
-        if re.match(r'^\d+\.\s+[A-Z]', text) and '.' not in text[2:6]:
-            return 2
+        rest = text.lstrip(self.DIGITS)
+        if len(rest) < len(text) and rest[:1] == '.':
+            after_dot = rest[1:]
 
-        # Numbered subsections (1.1, 2.1) -> h3
-        if re.match(r'^\d+\.\d+\.?\s+', text):
-            return 3
+            # Numbered main sections ("1. Title", "2. Title") -> h2
+            title = after_dot.lstrip()
+            if len(title) < len(after_dot) and 'A' <= title[:1] <= 'Z' and '.' not in text[2:6]:
+                return 2
+
+            sub_rest = after_dot.lstrip(self.DIGITS)
+            if len(sub_rest) < len(after_dot):
+                # Numbered subsections ("1.1 ", "2.1. ") -> h3
+                if sub_rest[:1].isspace() or (sub_rest[:1] == '.' and sub_rest[1:2].isspace()):
+                    return 3
 
-        # Sub-subsections (1.1.1) -> h4
-        if re.match(r'^\d+\.\d+\.\d+', text):
-            return 4
+                # Sub-subsections ("1.1.1") -> h4
+                if sub_rest[:1] == '.' and sub_rest[1:2].isdecimal():
+                    return 4
 
         # Default for keywords like Abstract, References
         return 2
@@ -996,16 +1224,7 @@ class PDFToAccessibleHTML:
                 continue
 
             # Skip common non-title patterns
-            skip_patterns = [
-                r'^Abstract',
-                r'^Keywords',
-                r'^Introduction',
-                r'^\d',
-                r'^arXiv:',
-                r'^Fig\.',
-                r'^Table',
-            ]
-            if any(re.match(p, text, re.I) for p in skip_patterns):
+            if any(p.match(text) for p in self.TITLE_SKIP_PATTERNS):
                 continue
 
             # Skip if it's just author names (short with only proper nouns)
@@ -1031,7 +1250,9 @@ class PDFToAccessibleHTML:
 
     def _generate_semantic_html(self, blocks: List[TextBlock], title: str) -> str:
         """Generate semantic HTML with proper structure."""
-        html_parts = [
+        out = io.StringIO()
+        write = out.write
+        write('\n'.join([
             '<!DOCTYPE html>',
             '<html lang="en">',
             '<head>',
@@ -1082,227 +1303,226 @@ class PDFToAccessibleHTML:
             '</head>',
             '<body>',
             f'  <h1>{html.escape(title)}</h1>',
-        ]
+        ]))
 
         current_section = None
 
         for block in blocks:
-            text = html.escape(block.text.strip())
+            raw_text = block.text.strip()
 
-            if not text:
+            if not raw_text:
                 continue
 
+            text = html.escape(raw_text)
+
             if block.block_type == 'heading':
                 level = block.heading_level
 
                 # Close previous section if open
                 if current_section:
-                    html_parts.append('  </section>')
+                    write('\n  </section>')
 
-                # Create section ID from heading text
-                section_id = re.sub(r'[^a-z0-9]+', '-', text.lower())[:50].strip('-')
+                # Create section ID from the unescaped heading text; ids
+                # only keep [a-z0-9-], so escaping first just adds "amp" noise
+                section_id = self._slugify(raw_text.lower())
 
-                html_parts.append(f'  <section id="{section_id}" aria-labelledby="{section_id}-heading">')
-                html_parts.append(f'    <h{level} id="{section_id}-heading">{text}</h{level}>')
+                write(f'\n  <section id="{section_id}" aria-labelledby="{section_id}-heading">')
+                write(f'\n    <h{level} id="{section_id}-heading">{text}</h{level}>')
                 current_section = section_id
             else:
                 # Regular paragraph - only include if substantial
                 if len(text) > 30:
-                    html_parts.append(f'    <p>{text}</p>')
+                    write(f'\n    <p>{text}</p>')
 
         # Close last section
         if current_section:
-            html_parts.append('  </section>')
+            write('\n  </section>')
 
-        html_parts.extend([
-            '</body>',
-            '</html>'
-        ])
+        write(
+            '\n</body>'
+            '\n</html>'
+        )
 
-        return '\n'.join(html_parts)
+        return out.getvalue()
 
     def _generate_html_from_structure(self, doc: 'DocumentStructure') -> str:
         """Generate semantic HTML from Claude's structured output."""
         from .claude_processor import BlockType
 
-        html_parts = [
+        out = io.StringIO()
+        write = out.write
+        write('\n'.join([
             '<!DOCTYPE html>',
             '<html lang="en">',
             '<head>',
             '  <meta charset="utf-8">',
             '  <meta name="viewport" content="width=device-width, initial-scale=1.0">',
             f'  <title>{html.escape(doc.title)}</title>',
-        ]
+        ]))
 
         # Add metadata
         if doc.authors:
-            html_parts.append(f'  <meta name="author" content="{html.escape(", ".join(doc.authors))}">')
+            write(f'\n  <meta name="author" content="{html.escape(", ".join(doc.authors))}">')
 
         if doc.metadata.get('keywords'):
             keywords = ', '.join(doc.metadata['keywords'])
-            html_parts.append(f'  <meta name="keywords" content="{html.escape(keywords)}">')
+            write(f'\n  <meta name="keywords" content="{html.escape(keywords)}">')
 
         if doc.abstract:
             desc = doc.abstract[:200] + '...' if len(doc.abstract) > 200 else doc.abstract
-            html_parts.append(f'  <meta name="description" content="{html.escape(desc)}">')
+            write(f'\n  <meta name="description" content="{html.escape(desc)}">')
 
         # Basic styles (will be enhanced by WCAG enhancer)
-        html_parts.extend([
-            '  <style>',
-            '    body {',
-            '      font-family: Georgia, "Times New Roman", Times, serif;',
-            '      font-size: 1.1rem;',
-            '      line-height: 1.8;',
-            '      max-width: 50rem;',
-            '      margin: 0 auto;',
-            '      padding: 2rem 1.5rem;',
-            '      color: #1a1a1a;',
-            '    }',
-            '    h1 { font-size: 1.75rem; line-height: 1.3; margin-bottom: 1.5rem; text-align: center; }',
-            '    h2 { font-size: 1.4rem; margin-top: 2.5rem; margin-bottom: 1rem; border-bottom: 1px solid #ccc; padding-bottom: 0.5rem; }',
-            '    h3 { font-size: 1.2rem; margin-top: 2rem; margin-bottom: 0.75rem; }',
-            '    h4 { font-size: 1.1rem; margin-top: 1.5rem; margin-bottom: 0.5rem; }',
-            '    p { margin-bottom: 1rem; text-align: justify; }',
-            '    section { margin-bottom: 2rem; }',
-            '    .authors { text-align: center; font-size: 1.1rem; margin-bottom: 2rem; }',
-            '    .abstract { background: #f9f9f9; padding: 1.5rem; border-left: 4px solid #0066cc; margin: 2rem 0; }',
-            '    .abstract h2 { margin-top: 0; border-bottom: none; }',
-            '    .references { font-size: 0.9rem; }',
-            '    .references ol { padding-left: 2rem; }',
-            '    .references li { margin-bottom: 0.75rem; }',
-            '  </style>',
-            '</head>',
-            '<body>',
-        ])
+        write(
+            '\n  <style>'
+            '\n    body {'
+            '\n      font-family: Georgia, "Times New Roman", Times, serif;'
+            '\n      font-size: 1.1rem;'
+            '\n      line-height: 1.8;'
+            '\n      max-width: 50rem;'
+            '\n      margin: 0 auto;'
+            '\n      padding: 2rem 1.5rem;'
+            '\n      color: #1a1a1a;'
+            '\n    }'
+            '\n    h1 { font-size: 1.75rem; line-height: 1.3; margin-bottom: 1.5rem; text-align: center; }'
+            '\n    h2 { font-size: 1.4rem; margin-top: 2.5rem; margin-bottom: 1rem; border-bottom: 1px solid #ccc; padding-bottom: 0.5rem; }'
+            '\n    h3 { font-size: 1.2rem; margin-top: 2rem; margin-bottom: 0.75rem; }'
+            '\n    h4 { font-size: 1.1rem; margin-top: 1.5rem; margin-bottom: 0.5rem; }'
+            '\n    p { margin-bottom: 1rem; text-align: justify; }'
+            '\n    section { margin-bottom: 2rem; }'
+            '\n    .authors { text-align: center; font-size: 1.1rem; margin-bottom: 2rem; }'
+            '\n    .abstract { background: #f9f9f9; padding: 1.5rem; border-left: 4px solid #0066cc; margin: 2rem 0; }'
+            '\n    .abstract h2 { margin-top: 0; border-bottom: none; }'
+            '\n    .references { font-size: 0.9rem; }'
+            '\n    .references ol { padding-left: 2rem; }'
+            '\n    .references li { margin-bottom: 0.75rem; }'
+            '\n  </style>'
+            '\n</head>'
+            '\n<body>'
+        )
 
         # Header with title and authors
-        html_parts.append('  <header>')
-        html_parts.append(f'    <h1>{html.escape(doc.title)}</h1>')
+        write('\n  <header>')
+        write(f'\n    <h1>{html.escape(doc.title)}</h1>')
 
         if doc.authors:
             authors_html = ', '.join(f'<strong>{html.escape(a)}</strong>' for a in doc.authors)
-            html_parts.append(f'    <p class="authors">{authors_html}</p>')
+            write(f'\n    <p class="authors">{authors_html}</p>')
 
-        html_parts.append('  </header>')
+        write('\n  </header>')
 
         # Abstract section
         if doc.abstract:
             abstract_escaped = html.escape(doc.abstract)
-            html_parts.extend([
-                '  <section class="abstract" aria-labelledby="abstract-heading">',
-                '    <h2 id="abstract-heading">Abstract</h2>',
-                f'    <p>{abstract_escaped}</p>',
-                '  </section>',
-            ])
+            write(
+                '\n  <section class="abstract" aria-labelledby="abstract-heading">'
+                '\n    <h2 id="abstract-heading">Abstract</h2>'
+                f'\n    <p>{abstract_escaped}</p>'
+                '\n  </section>'
+            )
+
+        # Markup for block types that just wrap their content, looked up once
+        # per block; an empty template drops the block. Headings and
+        # references depend on section state and are handled inline;
+        # paragraphs and unknown types fall through to the default below.
+        templates = {
+            BlockType.LIST_ITEM.value: '\n    <li>{}</li>',
+            BlockType.FIGURE_CAPTION.value: (
+                '\n    <figure>'
+                '\n      <figcaption>{}</figcaption>'
+                '\n    </figure>'
+            ),
+            BlockType.TABLE.value: '\n    <div class="table-content">{}</div>',
+            BlockType.DEFINITION.value: (
+                '\n    <div class="definition" role="region">'
+                '\n      <p>{}</p>'
+                '\n    </div>'
+            ),
+            BlockType.ALGORITHM.value: (
+                '\n    <div class="algorithm" role="region">'
+                '\n      <pre>{}</pre>'
+                '\n    </div>'
+            ),
+            BlockType.METADATA.value: '\n    <p class="metadata">{}</p>',
+            # Authors already handled in header
+            BlockType.AUTHOR.value: '',
+            # Will be added at the end
+            BlockType.FOOTER.value: '',
+        }
 
         # Process content blocks
         current_section = None
         in_reference_section = False
 
         for block in doc.blocks:
-            content = html.escape(block.content.strip())
-            if not content:
+            raw_content = block.content.strip()
+            if not raw_content:
                 continue
+            content = html.escape(raw_content)
+            block_type = block.block_type
 
-            if block.block_type == BlockType.HEADING.value:
+            if block_type == BlockType.HEADING.value:
                 level = block.heading_level or 2
                 level = min(max(level, 2), 4)  # Clamp to 2-4
 
                 # Close previous section if open
                 if current_section:
                     if in_reference_section:
-                        html_parts.append('    </ol>')
+                        write('\n    </ol>')
                         in_reference_section = False
-                    html_parts.append('  </section>')
+                    write('\n  </section>')
 
-                # Create section ID
-                section_id = re.sub(r'[^a-z0-9]+', '-', content.lower())[:50].strip('-')
+                # Create section ID from the unescaped heading text
+                content_lower = raw_content.lower()
+                section_id = self._slugify(content_lower)
                 heading_id = f"{section_id}-heading"
 
                 # Check if this is references section
-                is_references = 'reference' in content.lower()
+                is_references = 'reference' in content_lower
 
                 if is_references:
-                    html_parts.extend([
-                        f'  <section id="references" class="references" aria-labelledby="references-heading">',
-                        f'    <h{level} id="references-heading">{content}</h{level}>',
-                        '    <ol>',
-                    ])
+                    write(
+                        f'\n  <section id="references" class="references" aria-labelledby="references-heading">'
+                        f'\n    <h{level} id="references-heading">{content}</h{level}>'
+                        '\n    <ol>'
+                    )
                     in_reference_section = True
                 else:
-                    html_parts.extend([
-                        f'  <section id="{section_id}" aria-labelledby="{heading_id}">',
-                        f'    <h{level} id="{heading_id}">{content}</h{level}>',
-                    ])
+                    write(
+                        f'\n  <section id="{section_id}" aria-labelledby="{heading_id}">'
+                        f'\n    <h{level} id="{heading_id}">{content}</h{level}>'
+                    )
 
                 current_section = section_id
 
-            elif block.block_type == BlockType.PARAGRAPH.value:
-                if len(content) > 30:
-                    html_parts.append(f'    <p>{content}</p>')
-
-            elif block.block_type == BlockType.REFERENCE.value:
+            elif block_type == BlockType.REFERENCE.value:
                 ref_num = block.reference_number or ''
                 if in_reference_section:
-                    html_parts.append(f'      <li id="ref-{ref_num}">{content}</li>')
+                    write(f'\n      <li id="ref-{ref_num}">{content}</li>')
                 else:
-                    html_parts.append(f'    <p class="reference">[{ref_num}] {content}</p>')
-
-            elif block.block_type == BlockType.LIST_ITEM.value:
-                html_parts.append(f'    <li>{content}</li>')
-
-            elif block.block_type == BlockType.FIGURE_CAPTION.value:
-                html_parts.extend([
-                    '    <figure>',
-                    f'      <figcaption>{content}</figcaption>',
-                    '    </figure>',
-                ])
-
-            elif block.block_type == BlockType.TABLE.value:
-                html_parts.append(f'    <div class="table-content">{content}</div>')
-
-            elif block.block_type == BlockType.DEFINITION.value:
-                html_parts.extend([
-                    '    <div class="definition" role="region">',
-                    f'      <p>{content}</p>',
-                    '    </div>',
-                ])
-
-            elif block.block_type == BlockType.ALGORITHM.value:
-                html_parts.extend([
-                    '    <div class="algorithm" role="region">',
-                    f'      <pre>{content}</pre>',
-                    '    </div>',
-                ])
-
-            elif block.block_type == BlockType.METADATA.value:
-                html_parts.append(f'    <p class="metadata">{content}</p>')
-
-            elif block.block_type == BlockType.AUTHOR.value:
-                # Authors already handled in header
-                pass
-
-            elif block.block_type == BlockType.FOOTER.value:
-                # Will be added at the end
-                pass
+                    write(f'\n    <p class="reference">[{ref_num}] {content}</p>')
 
             else:
-                # Default to paragraph for unknown types
-                if len(content) > 30:
-                    html_parts.append(f'    <p>{content}</p>')
+                template = templates.get(block_type)
+                if template is None:
+                    # Paragraphs, and the default for unknown types
+                    if len(content) > 30:
+                        write(f'\n    <p>{content}</p>')
+                elif template:
+                    write(template.format(content))
 
         # Close any open sections
         if current_section:
             if in_reference_section:
-                html_parts.append('    </ol>')
-            html_parts.append('  </section>')
+                write('\n    </ol>')
+            write('\n  </section>')
 
-        html_parts.extend([
-            '</body>',
-            '</html>'
-        ])
+        write(
+            '\n</body>'
+            '\n</html>'
+        )
 
-        return '\n'.join(html_parts)
+        return out.getvalue()
 
 
 # Alias for backwards compatibility
@@ -18,6 +18,18 @@ from pathlib import Path
 
 from bs4 import BeautifulSoup
 
+# Converted documents are generated, well-formed HTML, so embedding can use
+# the faster lxml tree builder when it's installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# "Figure 3" / "Fig. 3" at the start of a caption, and anywhere in body text
+_FIGURE_CAPTION_PATTERN = re.compile(r'^(?:Figure|Fig\.?)\s*(\d+)', re.IGNORECASE)
+_FIGURE_REFERENCE_PATTERN = re.compile(r'(?:Figure|Fig\.?)\s*(\d+)', re.IGNORECASE)
+
 
 def load_metadata(images_dir: Path) -> list:
     """Load images metadata from JSON file."""
@@ -33,7 +45,7 @@ def extract_figure_number(caption: str) -> int | None:
     """Extract figure number from caption text."""
     if not caption:
         return None
-    match = re.match(r'^(?:Figure|Fig\.?)\s*(\d+)', caption, re.IGNORECASE)
+    match = _FIGURE_CAPTION_PATTERN.match(caption)
     return int(match.group(1)) if match else None
 
 
@@ -61,9 +73,11 @@ def create_figure_element(soup: BeautifulSoup, img_data: dict, images_dir: Path,
     with open(img_path, 'rb') as f:
         img_bytes = f.read()
 
-    # Create data URI
+    # Create data URI. Base64 output is pure ASCII, so the ascii codec
+    # decodes it without UTF-8 validation.
     mime_type = get_mime_type(img_data['filename'])
-    data_uri = f"data:{mime_type};base64,{base64.b64encode(img_bytes).decode()}"
+    encoded = base64.b64encode(img_bytes).decode('ascii')
+    data_uri = 'data:' + mime_type + ';base64,' + encoded
 
     # Create figure element
     figure = soup.new_tag('figure')
@@ -73,7 +87,11 @@ def create_figure_element(soup: BeautifulSoup, img_data: dict, images_dir: Path,
     # Create img tag
     img_tag = soup.new_tag('img')
     img_tag['src'] = data_uri
-    img_tag['alt'] = img_data.get('alt_text', f"Figure from page {img_data.get('page', '?')}")
+    if img_data.get('decorative'):
+        img_tag['alt'] = ''
+        img_tag['role'] = 'presentation'
+    else:
+        img_tag['alt'] = img_data.get('alt_text', f"Figure from page {img_data.get('page', '?')}")
     img_tag['loading'] = 'lazy'
     if img_data.get('width'):
         img_tag['width'] = img_data['width']
@@ -113,16 +131,18 @@ def create_figure_element(soup: BeautifulSoup, img_data: dict, images_dir: Path,
 
 def find_figure_references(text: str) -> list[int]:
     """Find all figure references in text."""
-    pattern = r'(?:Figure|Fig\.?)\s*(\d+)'
-    matches = re.findall(pattern, text, re.IGNORECASE)
-    return [int(m) for m in matches]
+    # Most paragraphs mention no figure; a substring test rules them out
+    # without running the regex
+    if 'fig' not in text.lower():
+        return []
+    return [int(m) for m in _FIGURE_REFERENCE_PATTERN.findall(text)]
 
 
 def embed_images(html_path: Path, images_dir: Path, output_path: Path = None) -> None:
     """Embed images into HTML file near their references."""
     # Load HTML
     with open(html_path, 'r', encoding='utf-8') as f:
-        soup = BeautifulSoup(f.read(), 'html.parser')
+        soup = BeautifulSoup(f.read(), HTML_PARSER)
 
     # Load metadata
     metadata = load_metadata(images_dir)
@@ -152,12 +172,19 @@ def embed_images(html_path: Path, images_dir: Path, output_path: Path = None) ->
         print("Error: No <main> or <body> element found")
         return
 
-    # Process paragraphs to find and insert figures after references
+    # Process paragraphs to find and insert figures after references. Each
+    # element's text is built once, and the substring test skips the regex
+    # for the many paragraphs that mention no figure.
     for para in main.find_all(['p', 'li']):
+        if len(inserted) == len(figure_map):
+            break
+
         text = para.get_text()
-        refs = find_figure_references(text)
+        if 'fig' not in text.lower():
+            continue
 
-        for fig_num in refs:
+        for match in _FIGURE_REFERENCE_PATTERN.finditer(text):
+            fig_num = int(match.group(1))
             if fig_num in inserted:
                 continue
             if fig_num not in figure_map:
@@ -5,18 +5,67 @@ Extracts images from PDF documents using PyMuPDF and processes them
 for embedding in accessible HTML.
 """
 
-import base64
+import binascii
 import hashlib
 import io
 import logging
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Optional, Tuple
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 logger = logging.getLogger(__name__)
 
 
+def _dedup_hash(data) -> str:
+    """
+    Hash image bytes (any bytes-like object) for in-document deduplication.
+
+    Collision detection only, so a non-cryptographic hash is enough:
+    xxh3-128 when xxhash is installed, else BLAKE2b-128 (still much faster
+    than MD5). xxhash's one-shot digest function hashes without creating a
+    hasher object per image.
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# MIME types of the image formats PyMuPDF and Pillow produce
+_MIME_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+    'webp': 'image/webp',
+    'bmp': 'image/bmp',
+    'tiff': 'image/tiff',
+    'tif': 'image/tiff',
+}
+
+
+def _mime_type(ext: str) -> str:
+    """Get MIME type from file extension, defaulting to PNG."""
+    # PyMuPDF and Pillow report lower-case extensions, so the exact lookup
+    # almost always hits and ext.lower() is only needed as a fallback
+    return _MIME_TYPES.get(ext) or _MIME_TYPES.get(ext.lower(), 'image/png')
+
+
+def _data_uri(mime_type: str, data: bytes) -> str:
+    """Build a base64 data URI for embedding image bytes in HTML."""
+    # b2a_base64 is what base64.b64encode wraps; base64 output is ASCII, so
+    # the ascii codec decodes it without UTF-8 validation
+    encoded = binascii.b2a_base64(data, newline=False).decode('ascii')
+    return 'data:' + mime_type + ';base64,' + encoded
+
+
 @dataclass
 class ExtractedImage:
     """Represents an image extracted from a PDF."""
@@ -27,11 +76,24 @@ class ExtractedImage:
     height: int                    # Image height in pixels
     bbox: Tuple[float, float, float, float] = (0, 0, 0, 0)  # Bounding box
     nearby_caption: str = ""       # Caption text found near image
-    data_uri: str = ""             # Base64 data URI for embedding
+    data_uri: str = ""             # Explicit data URI; see as_data_uri()
     image_hash: str = ""           # Hash for deduplication
     alt_text: str = ""             # Generated alt text
     long_description: str = ""     # Extended description
     is_vector_render: bool = False # True if rendered from vector graphics
+    is_decorative: bool = False    # True if purely decorative (empty alt, role="presentation")
+
+    def as_data_uri(self) -> str:
+        """
+        Get the base64 data URI for embedding the image.
+
+        The URI is built from data on each call unless one was set
+        explicitly, so extracted images don't keep a base64 copy of their
+        bytes in memory until the HTML is written.
+        """
+        if self.data_uri:
+            return self.data_uri
+        return _data_uri(_mime_type(self.format), self.data)
 
 
 class VectorRegionExtractor:
@@ -277,10 +339,7 @@ class VectorRegionExtractor:
             png_data = pixmap.tobytes("png")
 
             # Calculate hash for deduplication
-            image_hash = hashlib.md5(png_data).hexdigest()
-
-            # Create data URI
-            data_uri = f"data:image/png;base64,{base64.b64encode(png_data).decode()}"
+            image_hash = _dedup_hash(png_data)
 
             return ExtractedImage(
                 data=png_data,
@@ -289,7 +348,6 @@ class VectorRegionExtractor:
                 width=pixmap.width,
                 height=pixmap.height,
                 bbox=(bbox.x0, bbox.y0, bbox.x1, bbox.y1),
-                data_uri=data_uri,
                 image_hash=image_hash,
                 is_vector_render=True,
                 nearby_caption="",  # Will be filled by caption finder
@@ -310,11 +368,19 @@ class PDFImageExtractor:
     # Maximum image size in bytes (5MB)
     MAX_SIZE_BYTES = 5 * 1024 * 1024
 
-    # Caption detection patterns
-    CAPTION_PATTERNS = [
-        re.compile(r'^(Figure|Fig\.?)\s*\d+[.:]?\s*(.*)$', re.IGNORECASE),
-        re.compile(r'^(Image|Diagram|Chart|Graph|Photo)\s*\d*[.:]?\s*(.*)$', re.IGNORECASE),
-    ]
+    # Leading bytes hashed for deduplication, together with the total size.
+    # Distinct embedded images practically never share both, and large
+    # repeated images (logos, backgrounds) then cost one 64 KiB hash each.
+    DEDUP_PREFIX_BYTES = 64 * 1024
+
+    # Caption detection ("Figure 3:", "Fig. 3", "Chart 2.", "Photo:"), as one
+    # anchored alternation so each line costs a single match
+    CAPTION_PATTERN = re.compile(
+        r'^(?:(?:Figure|Fig\.?)\s*\d+|(?:Image|Diagram|Chart|Graph|Photo)\s*\d*)'
+        r'[.:]?\s*(.*)$',
+        re.IGNORECASE
+    )
+    CAPTION_PATTERNS = [CAPTION_PATTERN]
 
     def __init__(
         self,
@@ -338,6 +404,9 @@ class PDFImageExtractor:
         self.extract_vector_graphics = extract_vector_graphics
         self._doc = None
         self._fitz = None
+        # Page count, read once: len() on a Document calls into MuPDF, and
+        # so does the truth test of the document itself
+        self._num_pages = 0
 
         # Initialize vector extractor if enabled
         self._vector_extractor = None
@@ -352,7 +421,8 @@ class PDFImageExtractor:
             import fitz  # PyMuPDF
             self._fitz = fitz
             self._doc = fitz.open(pdf_path)
-            logger.debug(f"Opened PDF with {len(self._doc)} pages")
+            self._num_pages = len(self._doc)
+            logger.debug(f"Opened PDF with {self._num_pages} pages")
         except ImportError:
             logger.warning("PyMuPDF not installed. Image extraction unavailable.")
         except Exception as e:
@@ -365,20 +435,17 @@ class PDFImageExtractor:
         Returns:
             List of ExtractedImage objects
         """
-        if not self._doc:
+        if not self._num_pages:
             return []
 
         images = []
+        seen_xrefs = set()
         seen_hashes = set()
 
-        for page_num in range(len(self._doc)):
-            page_images = self.extract_from_page(page_num)
-
-            # Deduplicate within document
-            for img in page_images:
-                if img.image_hash not in seen_hashes:
-                    seen_hashes.add(img.image_hash)
-                    images.append(img)
+        for page_num in range(self._num_pages):
+            # Deduplicate within document; images seen on earlier pages are
+            # skipped before any caption search
+            images.extend(self._extract_page(page_num, seen_xrefs, seen_hashes))
 
         logger.info(f"Extracted {len(images)} unique images from PDF")
         return images
@@ -393,23 +460,65 @@ class PDFImageExtractor:
         Returns:
             List of ExtractedImage objects from this page
         """
-        if not self._doc or page_num >= len(self._doc):
+        return self._extract_page(page_num, set(), None)
+
+    def _extract_page(
+        self,
+        page_num: int,
+        seen_xrefs: set,
+        seen_hashes: Optional[set]
+    ) -> List[ExtractedImage]:
+        """
+        Extract images from a page, skipping ones already seen.
+
+        An image object shared by many pages (logos, backgrounds) keeps its
+        xref, so repeats are skipped without decoding them again.
+
+        Args:
+            page_num: Page number (0-indexed)
+            seen_xrefs: Raster image xrefs already extracted; updated in place
+            seen_hashes: Image hashes already extracted, updated in place, or
+                None to keep images with duplicate content
+
+        Returns:
+            List of ExtractedImage objects from this page
+        """
+        if not self._num_pages or page_num >= self._num_pages:
             return []
 
         images = []
         page = self._doc[page_num]
 
-        # Extract raster images
+        # The page's text blocks are read on the first caption search and
+        # shared by every image on the page
+        text_blocks = None
+
+        # Extract raster images. get_image_info lists each placement with its
+        # bbox in one pass over the page; an image placed more than once is
+        # taken at its first placement, and inline images (xref 0) can't be
+        # extracted by xref.
         try:
-            image_list = page.get_images(full=True)
+            image_infos = page.get_image_info(xrefs=True)
+
+            for img_index, img_info in enumerate(image_infos):
+                xref = img_info['xref']
+                if not xref or xref in seen_xrefs:
+                    continue
+                seen_xrefs.add(xref)
 
-            for img_index, img_info in enumerate(image_list):
                 try:
-                    extracted = self._extract_image(page, img_info, page_num)
+                    extracted = self._extract_image(xref, tuple(img_info['bbox']), page_num)
                     if extracted:
+                        if seen_hashes is not None:
+                            if extracted.image_hash in seen_hashes:
+                                continue
+                            seen_hashes.add(extracted.image_hash)
+
                         # Try to find nearby caption
+                        if text_blocks is None:
+                            text_blocks = self._get_text_blocks(page)
                         extracted.nearby_caption = self._find_nearby_caption(
-                            page, extracted.bbox
+                            page, extracted.bbox, text_blocks
                         )
                         images.append(extracted)
                 except Exception as e:
@@ -423,8 +532,17 @@ class PDFImageExtractor:
             try:
                 vector_images = self._vector_extractor.extract_regions(page, page_num)
                 for vimg in vector_images:
+                    if seen_hashes is not None:
+                        if vimg.image_hash in seen_hashes:
+                            continue
+                        seen_hashes.add(vimg.image_hash)
+
                     # Try to find nearby caption for vector regions
-                    vimg.nearby_caption = self._find_nearby_caption(page, vimg.bbox)
+                    if text_blocks is None:
+                        text_blocks = self._get_text_blocks(page)
+                    vimg.nearby_caption = self._find_nearby_caption(
+                        page, vimg.bbox, text_blocks
+                    )
                     images.append(vimg)
             except Exception as e:
                 logger.warning(f"Failed to extract vector regions from page {page_num + 1}: {e}")
@@ -433,23 +551,21 @@ class PDFImageExtractor:
 
     def _extract_image(
         self,
-        page,
-        img_info: tuple,
+        xref: int,
+        bbox: Tuple[float, float, float, float],
         page_num: int
     ) -> Optional[ExtractedImage]:
         """
         Extract a single image from page.
 
         Args:
-            page: PyMuPDF page object
-            img_info: Image info tuple from get_images()
+            xref: Image xref
+            bbox: Bounding box of the image on the page
             page_num: Page number (0-indexed)
 
         Returns:
             ExtractedImage or None if extraction fails
         """
-        xref = img_info[0]
-
         try:
             base_image = self._doc.extract_image(xref)
         except Exception as e:
@@ -474,15 +590,10 @@ class PDFImageExtractor:
             logger.warning(f"Skipping oversized image: {len(image_bytes) / 1024 / 1024:.1f}MB")
             return None
 
-        # Calculate hash for deduplication
-        image_hash = hashlib.md5(image_bytes).hexdigest()
-
-        # Find bounding box on page
-        bbox = self._get_image_bbox(page, xref)
-
-        # Generate data URI
-        mime_type = self._get_mime_type(image_ext)
-        data_uri = f"data:{mime_type};base64,{base64.b64encode(image_bytes).decode()}"
+        # Calculate hash for deduplication from the size and a prefix of the
+        # bytes (memoryview slicing avoids copying it)
+        prefix = memoryview(image_bytes)[:self.DEDUP_PREFIX_BYTES]
+        image_hash = f"{len(image_bytes):x}-{_dedup_hash(prefix)}"
 
         return ExtractedImage(
             data=image_bytes,
@@ -491,38 +602,39 @@ class PDFImageExtractor:
             width=width,
             height=height,
             bbox=bbox,
-            data_uri=data_uri,
             image_hash=image_hash,
         )
 
-    def _get_image_bbox(self, page, xref: int) -> Tuple[float, float, float, float]:
+    def _get_text_blocks(self, page) -> list:
         """
-        Get bounding box for image on page.
+        Get the text blocks of a page for caption searches.
 
         Args:
             page: PyMuPDF page object
-            xref: Image xref
 
         Returns:
-            Bounding box (x0, y0, x1, y1)
+            List of (x0, y0, x1, y1, text, block_no, block_type) tuples for
+            text blocks, or an empty list if extraction fails
         """
         try:
-            for img in page.get_images(full=True):
-                if img[0] == xref:
-                    # Get image rectangle
-                    img_rects = page.get_image_rects(img)
-                    if img_rects:
-                        rect = img_rects[0]
-                        return (rect.x0, rect.y0, rect.x1, rect.y1)
+            return [b for b in page.get_text("blocks") if b[6] == 0]
         except Exception as e:
-            logger.debug(f"Could not get bbox for image: {e}")
+            logger.debug(f"Could not get text blocks: {e}")
+            return []
 
-        return (0, 0, 0, 0)
+    @staticmethod
+    def _text_in_region(text_blocks: list, x0: float, y0: float, x1: float, y1: float) -> str:
+        """Join the text of the blocks that overlap a region, in page order."""
+        return ''.join(
+            b[4] for b in text_blocks
+            if b[0] < x1 and b[2] > x0 and b[1] < y1 and b[3] > y0
+        ).strip()
 
     def _find_nearby_caption(
         self,
         page,
-        bbox: Tuple[float, float, float, float]
+        bbox: Tuple[float, float, float, float],
+        text_blocks: Optional[list] = None
     ) -> str:
         """
         Find caption text near an image.
@@ -530,6 +642,8 @@ class PDFImageExtractor:
         Args:
             page: PyMuPDF page object
             bbox: Image bounding box
+            text_blocks: The page's text blocks from _get_text_blocks; read
+                from the page if not given
 
         Returns:
             Caption text if found, empty string otherwise
@@ -540,45 +654,34 @@ class PDFImageExtractor:
         try:
             x0, y0, x1, y1 = bbox
 
-            # Search in area below the image (most common caption location)
-            search_rect = self._fitz.Rect(
-                x0 - 10,           # Slightly wider
-                y1,                 # Start at bottom of image
-                x1 + 10,
-                y1 + 100            # Look 100 points below
-            )
-
-            text_below = page.get_text("text", clip=search_rect).strip()
-
-            # Check if it matches caption pattern
-            for pattern in self.CAPTION_PATTERNS:
-                match = pattern.match(text_below.split('\n')[0] if text_below else "")
-                if match:
-                    # Return full caption (may span multiple lines)
-                    lines = text_below.split('\n')
-                    caption_lines = [lines[0]]
-                    # Include continuation lines (no new caption start)
-                    for line in lines[1:4]:  # Max 4 lines
-                        if not any(p.match(line) for p in self.CAPTION_PATTERNS):
-                            if line.strip():
-                                caption_lines.append(line.strip())
-                        else:
-                            break
-                    return ' '.join(caption_lines)
-
-            # Also check above the image
-            search_rect = self._fitz.Rect(
-                x0 - 10,
-                y0 - 60,            # Look 60 points above
-                x1 + 10,
-                y0
-            )
-
-            text_above = page.get_text("text", clip=search_rect).strip()
-            for pattern in self.CAPTION_PATTERNS:
-                match = pattern.match(text_above.split('\n')[-1] if text_above else "")
-                if match:
-                    return text_above.split('\n')[-1]
+            if text_blocks is None:
+                text_blocks = self._get_text_blocks(page)
+
+            # Search in area below the image (most common caption location):
+            # slightly wider than the image, looking 100 points below it
+            text_below = self._text_in_region(text_blocks, x0 - 10, y1, x1 + 10, y1 + 100)
+
+            # Check if the first line matches the caption pattern; the text
+            # is only split into lines once a caption is found
+            caption_pattern = self.CAPTION_PATTERN
+            if caption_pattern.match(text_below.partition('\n')[0]):
+                # Return full caption (may span multiple lines)
+                lines = text_below.split('\n', 4)
+                caption_lines = [lines[0]]
+                # Include continuation lines (no new caption start)
+                for line in lines[1:4]:  # Max 4 lines
+                    if not caption_pattern.match(line):
+                        if line.strip():
+                            caption_lines.append(line.strip())
+                    else:
+                        break
+                return ' '.join(caption_lines)
+
+            # Also check above the image, looking 60 points above it
+            text_above = self._text_in_region(text_blocks, x0 - 10, y0 - 60, x1 + 10, y0)
+            last_line = text_above.rpartition('\n')[2]
+            if caption_pattern.match(last_line):
+                return last_line
 
         except Exception as e:
             logger.debug(f"Caption search failed: {e}")
@@ -587,23 +690,14 @@ class PDFImageExtractor:
 
     def _get_mime_type(self, ext: str) -> str:
         """Get MIME type from file extension."""
-        mime_map = {
-            'png': 'image/png',
-            'jpg': 'image/jpeg',
-            'jpeg': 'image/jpeg',
-            'gif': 'image/gif',
-            'webp': 'image/webp',
-            'bmp': 'image/bmp',
-            'tiff': 'image/tiff',
-            'tif': 'image/tiff',
-        }
-        return mime_map.get(ext.lower(), 'image/png')
+        return _mime_type(ext)
 
     def close(self):
         """Close the PDF document."""
         if self._doc:
             self._doc.close()
             self._doc = None
+            self._num_pages = 0
 
     def __enter__(self):
         return self
@@ -615,6 +709,10 @@ class PDFImageExtractor:
 class ImageProcessor:
     """Process and optimize images for HTML embedding."""
 
+    # JPEGs already within max_width and under this size are embedded as-is;
+    # re-encoding them costs a full decode/encode for no real saving
+    MAX_PASSTHROUGH_JPEG_BYTES = 256 * 1024
+
     def __init__(self, max_width: int = 800, quality: int = 85):
         """
         Initialize processor.
@@ -642,14 +740,26 @@ class ImageProcessor:
             image: ExtractedImage to process
 
         Returns:
-            Processed ExtractedImage with updated data_uri
+            Processed ExtractedImage with updated data
         """
         if not self._pil:
             return image
 
+        if (image.format in ('jpg', 'jpeg')
+                and image.width <= self.max_width
+                and len(image.data) <= self.MAX_PASSTHROUGH_JPEG_BYTES):
+            return image
+
         try:
             img = self._pil.open(io.BytesIO(image.data))
 
+            # Let libjpeg decode large JPEGs at a reduced scale (1/2 to 1/8);
+            # draft keeps at least twice the target size, so the Lanczos
+            # resize below still has detail to work with
+            if img.format == 'JPEG' and img.width > self.max_width * 2:
+                target_width = self.max_width * 2
+                img.draft(img.mode, (target_width, img.height * target_width // img.width))
+
             # Resize if wider than max
             if img.width > self.max_width:
                 ratio = self.max_width / img.width
@@ -672,8 +782,8 @@ class ImageProcessor:
             image.data = output.getvalue()
             image.format = 'jpeg'
 
-            # Update data URI
-            image.data_uri = f"data:image/jpeg;base64,{base64.b64encode(image.data).decode()}"
+            # Drop any explicit data URI so as_data_uri() encodes the new bytes
+            image.data_uri = ""
 
         except Exception as e:
             logger.warning(f"Image processing failed: {e}")
@@ -690,4 +800,11 @@ class ImageProcessor:
         Returns:
             List of processed ExtractedImage objects
         """
-        return [self.process(img) for img in images]
+        # Decoding, resizing and JPEG encoding run in Pillow's C code, which
+        # releases the GIL, so images are processed on a thread pool
+        workers = min(os.cpu_count() or 1, len(images))
+        if workers <= 1:
+            return [self.process(img) for img in images]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.process, images))
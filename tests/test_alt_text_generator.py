@@ -1,10 +1,13 @@
 """Tests for alt text generation."""
 
+import asyncio
+import os
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 
 try:
-    from pdf_converter.alt_text_generator import AltTextGenerator, AltTextResult
+    from pdf_converter.alt_text_generator import AltTextGenerator, AltTextResult, ocr_thread_limit
     from pdf_converter.image_extractor import ExtractedImage
     HAS_MODULES = True
 except ImportError:
@@ -75,6 +78,20 @@ class TestAltTextGenerator:
         assert 'page 3' in result.alt_text.lower()
         assert '640x480' in result.long_description
 
+    def test_generic_fallback_reads_dimensions_from_header(self):
+        """Test missing dimensions are recovered from PNG/JPEG headers."""
+        gen = AltTextGenerator(use_ai=False, use_ocr_fallback=False)
+
+        png = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR' + (320).to_bytes(4, 'big') + (200).to_bytes(4, 'big')
+        jpeg = (
+            b'\xff\xd8\xff\xe0\x00\x04\x00\x00'         # SOI + APP0
+            b'\xff\xc0\x00\x11\x08' + (90).to_bytes(2, 'big') + (160).to_bytes(2, 'big')
+        )
+
+        for data, expected in ((png, '320x200'), (jpeg, '160x90')):
+            img = ExtractedImage(data=data, format='png', page=1, width=0, height=0)
+            assert expected in gen._generic_fallback(img).long_description
+
     def test_caption_fallback(self):
         """Test caption-based fallback."""
         gen = AltTextGenerator(use_ai=False, use_ocr_fallback=False)
@@ -182,6 +199,172 @@ class TestAltTextGenerator:
         messages = call_args.kwargs.get('messages', call_args.args[0] if call_args.args else [])
         assert len(messages) > 0
 
+    def test_claude_call_uses_cached_system_prompt(self):
+        """Test static instructions are sent as a cacheable system prompt."""
+        gen = AltTextGenerator(use_ai=False)
+        gen._client = MagicMock()
+        gen._client.messages.create.return_value = MagicMock(
+            content=[MagicMock(text="ALT: Test\nLONG: Extended")]
+        )
+
+        img = ExtractedImage(
+            data=b'test_image_data',
+            format='png',
+            page=1,
+            width=100,
+            height=100
+        )
+
+        gen._call_claude_vision(img, "Document context")
+
+        kwargs = gen._client.messages.create.call_args.kwargs
+        assert kwargs['system'][0]['text'] == AltTextGenerator.SYSTEM_PROMPT
+        assert kwargs['system'][0]['cache_control'] == {"type": "ephemeral"}
+        user_text = kwargs['messages'][0]['content'][-1]['text']
+        assert "FORMAT YOUR RESPONSE" not in user_text
+        assert "Document context" in user_text
+
+    def test_image_payload_reuses_data_uri(self):
+        """Test base64 data and media type are taken from an existing data URI."""
+        gen = AltTextGenerator(use_ai=False)
+
+        img = ExtractedImage(
+            data=b'test',
+            format='png',
+            page=1,
+            width=100,
+            height=100,
+            data_uri='data:image/jpeg;base64,dGVzdA=='
+        )
+
+        assert gen._get_image_payload(img) == ('image/jpeg', 'dGVzdA==')
+
+    def test_image_payload_encodes_raw_bytes(self):
+        """Test raw image bytes are encoded when no data URI exists."""
+        gen = AltTextGenerator(use_ai=False)
+
+        img = ExtractedImage(data=b'test', format='jpg', page=1, width=100, height=100)
+
+        assert gen._get_image_payload(img) == ('image/jpeg', 'dGVzdA==')
+
+    def test_ocr_fallback_uses_tesserocr_when_available(self):
+        """Test OCR runs in-process through a reused tesserocr handle."""
+        gen = AltTextGenerator(use_ai=False, use_ocr_fallback=False)
+        gen._pil = MagicMock()
+        gen._tesserocr = MagicMock()
+        api = gen._tesserocr.PyTessBaseAPI.return_value
+        api.GetUTF8Text.return_value = "Quarterly revenue by region"
+
+        img = ExtractedImage(data=b'test', format='png', page=1, width=100, height=100)
+
+        first = gen._try_ocr_fallback(img)
+        gen._try_ocr_fallback(img)
+
+        assert first.source == 'ocr'
+        assert 'Quarterly revenue' in first.alt_text
+        gen._tesserocr.PyTessBaseAPI.assert_called_once()
+
+    def test_pytesseract_runs_single_threaded(self, monkeypatch):
+        """Test tesseract subprocesses get OMP_THREAD_LIMIT only while OCR runs."""
+        monkeypatch.delenv('OMP_THREAD_LIMIT', raising=False)
+        gen = AltTextGenerator(use_ai=False, use_ocr_fallback=False)
+        gen._pil = MagicMock()
+        gen._pytesseract = MagicMock()
+        limits = []
+        gen._pytesseract.image_to_string.side_effect = lambda *args, **kwargs: (
+            limits.append(os.environ.get('OMP_THREAD_LIMIT')) or "Quarterly revenue by region"
+        )
+
+        img = ExtractedImage(data=b'test', format='png', page=1, width=100, height=100)
+        gen._try_ocr_fallback(img)
+
+        assert limits == ['1']
+        assert 'OMP_THREAD_LIMIT' not in os.environ
+
+    def test_ocr_thread_limit_keeps_caller_setting(self, monkeypatch):
+        """Test an OMP_THREAD_LIMIT set by the caller is neither changed nor removed."""
+        monkeypatch.setenv('OMP_THREAD_LIMIT', '4')
+
+        with ocr_thread_limit(), ocr_thread_limit():
+            assert os.environ['OMP_THREAD_LIMIT'] == '4'
+
+        assert os.environ['OMP_THREAD_LIMIT'] == '4'
+
+    def test_decorative_image_skips_expensive_paths(self):
+        """Test tiny uncaptioned images are classified as decorative."""
+        gen = AltTextGenerator(use_ai=False, use_ocr_fallback=True)
+
+        icon = ExtractedImage(data=b'x' * 2048, format='png', page=1, width=20, height=20)
+        result = gen.generate(icon)
+
+        assert result.source == 'decorative'
+        assert result.alt_text == ''
+        assert result.success is True
+
+    def test_captioned_image_is_not_decorative(self):
+        """Test a nearby caption overrides the decorative heuristics."""
+        gen = AltTextGenerator(use_ai=False, use_ocr_fallback=False)
+
+        img = ExtractedImage(
+            data=b'test',
+            format='png',
+            page=1,
+            width=20,
+            height=20,
+            nearby_caption="Figure 2: Logo"
+        )
+
+        assert gen._is_decorative(img) is False
+
+    def test_claude_results_cached_across_instances(self, tmp_path):
+        """Test a cached Claude result is reused instead of calling the API again."""
+        from pdf_converter.claude_processor import ResponseCache
+
+        img = ExtractedImage(data=b'x' * 4096, format='png', page=1, width=100, height=100)
+
+        def make_generator():
+            gen = AltTextGenerator(use_ai=False, use_ocr_fallback=False)
+            gen.use_ai = True
+            gen.cache = ResponseCache(tmp_path)
+            gen._client = MagicMock()
+            gen._client.messages.create.return_value = MagicMock(
+                content=[MagicMock(text="ALT: Cached alt\nLONG: Cached long")]
+            )
+            return gen
+
+        first = make_generator()
+        assert first.generate(img, "Context").alt_text == "Cached alt"
+
+        second = make_generator()
+        result = second.generate(img, "Context")
+
+        assert result.alt_text == "Cached alt"
+        assert result.source == 'claude'
+        second._client.messages.create.assert_not_called()
+
+    def test_image_payload_downscales_large_images(self):
+        """Test oversized images are downscaled to JPEG before upload."""
+        import base64
+        import io
+        import os
+
+        image_module = pytest.importorskip("PIL.Image")
+
+        gen = AltTextGenerator(use_ai=False, use_ocr_fallback=False)
+
+        # Random noise keeps the PNG above the resize byte threshold
+        noise = image_module.frombytes('RGB', (1600, 200), os.urandom(1600 * 200 * 3))
+        buffer = io.BytesIO()
+        noise.save(buffer, format='PNG')
+
+        img = ExtractedImage(data=buffer.getvalue(), format='png', page=1, width=1600, height=200)
+
+        media_type, data = gen._get_image_payload(img)
+        resized = image_module.open(io.BytesIO(base64.b64decode(data)))
+
+        assert media_type == 'image/jpeg'
+        assert max(resized.size) == AltTextGenerator.UPLOAD_MAX_EDGE
+
     def test_parse_response_standard_format(self):
         """Test parsing standard ALT/LONG format."""
         gen = AltTextGenerator(use_ai=False)
@@ -242,6 +425,121 @@ class TestAltTextGenerator:
         assert len(results) == 3
         assert all(r.success for r in results)
 
+    def test_generate_batch_preserves_order(self):
+        """Test concurrent batch generation returns results in input order."""
+        gen = AltTextGenerator(use_ai=False, use_ocr_fallback=False, max_concurrency=4)
+
+        images = [
+            ExtractedImage(
+                data=b'test',
+                format='png',
+                page=i,
+                width=100,
+                height=100,
+                nearby_caption=f"Figure {i}: Caption"
+            )
+            for i in range(8)
+        ]
+
+        results = gen.generate_batch(images, batch_delay=0)
+
+        assert [r.alt_text for r in results] == [f"Figure {i}: Caption" for i in range(8)]
+
+    def test_generate_batch_deduplicates_images(self):
+        """Test repeated images are described once and fanned back out."""
+        gen = AltTextGenerator(use_ai=False, use_ocr_fallback=False)
+        gen.generate = Mock(side_effect=lambda image, context: AltTextResult(
+            alt_text=f"Image from page {image.page}",
+            long_description="",
+            source="generic"
+        ))
+
+        logo = b'logo' * 512
+        images = [
+            ExtractedImage(data=logo, format='png', page=1, width=100, height=100),
+            ExtractedImage(data=b'chart' * 512, format='png', page=2, width=300, height=200),
+            ExtractedImage(data=logo, format='png', page=3, width=100, height=100),
+        ]
+
+        results = gen.generate_batch(images, batch_delay=0)
+
+        assert gen.generate.call_count == 2
+        assert [r.alt_text for r in results] == [
+            "Image from page 1", "Image from page 2", "Image from page 1"
+        ]
+        assert results[0] is not results[2]
+
+    def test_generate_batch_groups_images_per_request(self):
+        """Test several images are described by a single Claude request."""
+        gen = AltTextGenerator(
+            api_key='test-key', images_per_request=4, enable_cache=False
+        )
+        gen._client = MagicMock()
+        gen._client.messages.create.return_value = MagicMock(content=[MagicMock(text=(
+            "IMAGE 1 ALT: A bar chart\n"
+            "IMAGE 1 LONG: Sales by quarter.\n"
+            "IMAGE 2 ALT: A line graph\n"
+            "IMAGE 2 LONG: Growth over time."
+        ))])
+
+        images = [
+            ExtractedImage(data=b'bar' * 1024, format='png', page=1, width=300, height=200),
+            ExtractedImage(data=b'line' * 1024, format='png', page=2, width=300, height=200),
+        ]
+
+        results = gen.generate_batch(images, batch_delay=0)
+
+        gen._client.messages.create.assert_called_once()
+        content = gen._client.messages.create.call_args.kwargs['messages'][0]['content']
+        assert sum(block['type'] == 'image' for block in content) == 2
+        assert [r.alt_text for r in results] == ["A bar chart", "A line graph"]
+        assert results[1].long_description == "Growth over time."
+        assert all(r.source == "claude" for r in results)
+
+    def test_generate_batch_async(self):
+        """Test async batch generation preserves order."""
+        gen = AltTextGenerator(use_ai=False, use_ocr_fallback=False)
+
+        images = [
+            ExtractedImage(
+                data=b'test',
+                format='png',
+                page=i,
+                width=100,
+                height=100,
+                nearby_caption=f"Figure {i}: Caption"
+            )
+            for i in range(5)
+        ]
+
+        results = asyncio.run(gen.generate_batch_async(images, batch_delay=0, max_concurrency=2))
+
+        assert [r.alt_text for r in results] == [f"Figure {i}: Caption" for i in range(5)]
+
+    def test_generate_async_uses_async_client(self):
+        """Test async generation awaits the AsyncAnthropic client."""
+        gen = AltTextGenerator(use_ai=False, use_ocr_fallback=False)
+        gen.use_ai = True
+        gen._async_client = MagicMock()
+        gen._async_client.messages.create = AsyncMock(
+            return_value=MagicMock(content=[MagicMock(text="ALT: Async alt\nLONG: Async long")])
+        )
+
+        img = ExtractedImage(
+            data=b'x' * 4096,
+            format='png',
+            page=1,
+            width=100,
+            height=100,
+            nearby_caption="Figure 1: Test"
+        )
+
+        result = asyncio.run(gen.generate_async(img, "Context"))
+
+        assert result.source == 'claude'
+        assert result.alt_text == "Async alt"
+        gen._async_client.messages.create.assert_awaited_once()
+
 
 class TestRetryLogic:
     """Tests for retry and error handling."""
@@ -253,7 +551,53 @@ class TestRetryLogic:
         assert gen.MAX_RETRIES == 3
 
     @pytest.mark.skipif(not HAS_MODULES, reason="Required modules not installed")
-    def test_base_delay(self):
-        """Test base delay value."""
-        gen = AltTextGenerator(use_ai=False)
-        assert gen.BASE_DELAY == 1.0
+    def test_client_uses_sdk_retries(self):
+        """Test retries are delegated to the anthropic SDK client."""
+        mock_anthropic = MagicMock()
+
+        with patch.dict('sys.modules', {'anthropic': mock_anthropic}), \
+                patch('pdf_converter.alt_text_generator._HTTP_CLIENT', None):
+            gen = AltTextGenerator(api_key='test', use_ai=True, enable_cache=False)
+            assert gen.client is mock_anthropic.Anthropic.return_value
+
+        kwargs = mock_anthropic.Anthropic.call_args.kwargs
+        assert kwargs['max_retries'] == gen.MAX_RETRIES
+        assert kwargs['api_key'] == 'test'
+
+    @pytest.mark.skipif(not HAS_MODULES, reason="Required modules not installed")
+    def test_clients_share_http_connection_pool(self):
+        """Test generators reuse one HTTP client across instances."""
+        mock_anthropic = MagicMock()
+
+        with patch.dict('sys.modules', {'anthropic': mock_anthropic}), \
+                patch('pdf_converter.alt_text_generator._HTTP_CLIENT', None):
+            clients = [
+                AltTextGenerator(api_key='test', use_ai=True, enable_cache=False).client
+                for _ in range(2)
+            ]
+
+        assert clients == [mock_anthropic.Anthropic.return_value] * 2
+        mock_anthropic.DefaultHttpxClient.assert_called_once()
+        http_clients = [c.kwargs['http_client'] for c in mock_anthropic.Anthropic.call_args_list]
+        assert http_clients == [mock_anthropic.DefaultHttpxClient.return_value] * 2
+
+    @pytest.mark.skipif(not HAS_MODULES, reason="Required modules not installed")
+    def test_api_error_falls_back(self):
+        """Test an API error after SDK retries falls through to the fallback chain."""
+        gen = AltTextGenerator(api_key='test', use_ai=True, use_ocr_fallback=False, enable_cache=False)
+        gen._client = MagicMock()
+        gen._client.messages.create.side_effect = Exception("overloaded")
+
+        img = ExtractedImage(
+            data=b'x' * 4096,
+            format='png',
+            page=1,
+            width=100,
+            height=100,
+            nearby_caption="Figure 1: Test"
+        )
+
+        result = gen.generate(img)
+
+        assert result.source == 'caption'
+        gen._client.messages.create.assert_called_once()
@@ -0,0 +1,377 @@
+"""Tests for Claude-based structure processing."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from pdf_converter.claude_processor import (
+    ClaudeInvalidResponseError,
+    ClaudeProcessor,
+    ResponseCache,
+    _TokenBucket,
+)
+
+
+def stream_response(client, chunks):
+    """Make client.messages.stream yield the given text chunks."""
+    stream = client.messages.stream.return_value.__enter__.return_value
+    stream.text_stream = iter(chunks)
+
+
+class TestClaudeProcessor:
+    """Tests for ClaudeProcessor class."""
+
+    def test_process_text_caches_static_prompt_prefix(self):
+        """Test the system prompt and instructions are prompt-cache breakpoints."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False)
+        processor._client = MagicMock()
+        stream_response(processor._client, ['{"title": "Doc", "blocks": []}'])
+
+        result = processor.process_text("Raw {text} here")
+
+        assert result.title == "Doc"
+        kwargs = processor._client.messages.stream.call_args.kwargs
+        assert kwargs['system'][0]['text'] == ClaudeProcessor.SYSTEM_PROMPT
+        assert kwargs['system'][0]['cache_control'] == {"type": "ephemeral"}
+
+        instructions, header, document = kwargs['messages'][0]['content']
+        assert instructions['text'] == ClaudeProcessor.INSTRUCTIONS_PROMPT
+        assert instructions['cache_control'] == {"type": "ephemeral"}
+        assert 'cache_control' not in header and 'cache_control' not in document
+        assert document['text'] == "Raw {text} here"
+
+    def test_token_usage_tracks_prompt_cache_reads(self):
+        """Test response usage, including cache reads, is accumulated."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False)
+        processor._client = MagicMock()
+        stream = processor._client.messages.stream.return_value.__enter__.return_value
+        stream.get_final_message.return_value.usage = MagicMock(
+            input_tokens=120,
+            output_tokens=300,
+            cache_creation_input_tokens=0,
+            cache_read_input_tokens=1500,
+        )
+
+        for text in ("First", "Second"):
+            stream_response(processor._client, ['{"title": "Doc", "blocks": []}'])
+            processor.process_text(text)
+
+        assert processor.token_usage == {
+            'input_tokens': 240,
+            'output_tokens': 600,
+            'cache_creation_input_tokens': 0,
+            'cache_read_input_tokens': 3000,
+        }
+
+    def test_process_text_hands_over_blocks_while_streaming(self):
+        """Test on_block receives each block as soon as it is complete."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False)
+        processor._client = MagicMock()
+        received = []
+
+        def chunks():
+            yield '{"title": "Doc", "blocks": [{"block_type": "heading", '
+            yield '"content": "Intro {1}", "heading_level": 2}, '
+            assert [b.content for b in received] == ["Intro {1}"]
+            yield '{"block_type": "paragraph", "content": "Text \\" }"}]}'
+
+        stream_response(processor._client, chunks())
+
+        result = processor.process_text("Raw text", on_block=received.append)
+
+        assert [b.content for b in received] == ["Intro {1}", 'Text " }']
+        assert [b.content for b in result.blocks] == ["Intro {1}", 'Text " }']
+        assert received[0].heading_level == 2
+
+    def test_block_callback_errors_propagate(self):
+        """Test an exception from on_block is not reported as an API error."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False)
+        processor._client = MagicMock()
+        stream_response(processor._client, [
+            '{"title": "Doc", "blocks": [{"block_type": "paragraph", "content": "One"}]}',
+        ])
+
+        def on_block(block):
+            raise KeyError("callback failed")
+
+        with pytest.raises(KeyError, match="callback failed"):
+            processor.process_text("Raw text", on_block=on_block)
+
+    def test_process_texts_shares_one_request(self):
+        """Test small documents are processed together and mapped back by index."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False)
+        processor._client = MagicMock()
+        processor._client.messages.create.return_value = MagicMock(content=[MagicMock(text=(
+            '```json\n['
+            '{"doc_index": 2, "title": "Second", "blocks": []}, '
+            '{"doc_index": 1, "title": "First", "blocks": []}'
+            ']\n```'
+        ))])
+
+        results = processor.process_texts(["First doc text", "Second doc text"])
+
+        processor._client.messages.create.assert_called_once()
+        document = processor._client.messages.create.call_args.kwargs['messages'][0]['content'][-1]
+        assert "## DOC 1 ##\nFirst doc text" in document['text']
+        assert [r.title for r in results] == ["First", "Second"]
+
+    def test_process_texts_empty_response_falls_back(self):
+        """Test an empty shared response sends each document on its own."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False)
+        processor._client = MagicMock()
+        processor._client.messages.create.return_value = MagicMock(content=[])
+        # A list rather than an iterator, so each document's stream has text
+        stream = processor._client.messages.stream.return_value.__enter__.return_value
+        stream.text_stream = ['{"title": "Doc", "blocks": []}']
+
+        results = processor.process_texts(["First doc text", "Second doc text"])
+
+        processor._client.messages.create.assert_called_once()
+        assert processor._client.messages.stream.call_count == 2
+        assert [r.title for r in results] == ["Doc", "Doc"]
+
+    def test_truncated_response_keeps_complete_blocks(self, tmp_path):
+        """Test allow_partial recovers the blocks of a max_tokens-truncated response."""
+        processor = ClaudeProcessor(api_key='test-key', cache_dir=tmp_path, allow_partial=True)
+        processor._client = MagicMock()
+        stream_response(processor._client, [
+            '{"title": "Doc", "blocks": [{"block_type": "paragraph", "content": "One, two"}, ',
+            '{"block_type": "paragraph", "content": "Thr',
+        ])
+        stream = processor._client.messages.stream.return_value.__enter__.return_value
+        stream.get_final_message.return_value = MagicMock(stop_reason='max_tokens')
+
+        result = processor.process_text("Raw text")
+
+        assert [b.content for b in result.blocks] == ["One, two"]
+        assert result.metadata['partial'] is True
+        assert processor.cache.get("Raw text", processor.PROMPT_VERSION) is None
+
+    def test_truncated_response_fails_by_default(self):
+        """Test a truncated response still raises without allow_partial."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False)
+        processor._client = MagicMock()
+        stream_response(processor._client, ['{"title": "Doc", "blocks": [{"block_type": "para'])
+        stream = processor._client.messages.stream.return_value.__enter__.return_value
+        stream.get_final_message.return_value = MagicMock(stop_reason='max_tokens')
+
+        with pytest.raises(ClaudeInvalidResponseError):
+            processor.process_text("Raw text")
+
+    def test_chunked_processing_uses_message_batch(self):
+        """Test chunks are submitted as one batch and merged in document order."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False, use_batch=True)
+        processor._client = MagicMock()
+        batches = processor._client.messages.batches
+        batches.create.return_value = MagicMock(id='batch_1', processing_status='ended')
+
+        def entry(custom_id, title, content):
+            result = MagicMock(type='succeeded')
+            result.message.content = [MagicMock(text=(
+                f'{{"title": "{title}", "blocks": '
+                f'[{{"block_type": "paragraph", "content": "{content}"}}]}}'
+            ))]
+            return MagicMock(custom_id=custom_id, result=result)
+
+        # Results arrive in completion order, not submission order
+        batches.results.return_value = [
+            entry('chunk_1', 'Ignored', 'Second'),
+            entry('chunk_0', 'Doc', 'First'),
+        ]
+
+        result = processor._process_chunked('\f'.join(['page'] * 4), max_chunk_tokens=2)
+
+        batches.create.assert_called_once()
+        assert len(batches.create.call_args.kwargs['requests']) == 2
+        processor._client.messages.create.assert_not_called()
+        assert result.title == 'Doc'
+        assert [b.content for b in result.blocks] == ['First', 'Second']
+
+    def test_chunked_processing_runs_chunks_concurrently(self):
+        """Test chunks go through the async client and merge in document order."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False)
+        processor._client = MagicMock()
+
+        async def create(**kwargs):
+            text = kwargs['messages'][0]['content'][-1]['text']
+            content = 'First' if 'page0' in text else 'Second'
+            return MagicMock(content=[MagicMock(text=(
+                f'{{"title": "{content}", "blocks": '
+                f'[{{"block_type": "paragraph", "content": "{content}"}}]}}'
+            ))])
+
+        mock_anthropic = MagicMock()
+        async_client = mock_anthropic.AsyncAnthropic.return_value.__aenter__.return_value
+        async_client.messages.create = AsyncMock(side_effect=create)
+
+        pages = ['page0', 'page0', 'page1', 'page1']
+        with patch.dict('sys.modules', {'anthropic': mock_anthropic}):
+            result = processor._process_chunked('\f'.join(pages), max_chunk_tokens=2)
+
+        assert async_client.messages.create.await_count == 2
+        processor._client.messages.create.assert_not_called()
+        assert result.title == 'First'
+        assert [b.content for b in result.blocks] == ['First', 'Second']
+
+    def test_truncated_chunk_keeps_complete_blocks(self):
+        """Test allow_partial also covers chunks sent through the async client."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False, allow_partial=True)
+        processor._client = MagicMock()
+
+        async def create(**kwargs):
+            text = kwargs['messages'][0]['content'][-1]['text']
+            if 'page0' in text:
+                return MagicMock(stop_reason='end_turn', content=[MagicMock(text=(
+                    '{"title": "Doc", "blocks": [{"block_type": "paragraph", "content": "First"}]}'
+                ))])
+            return MagicMock(stop_reason='max_tokens', content=[MagicMock(text=(
+                '{"title": "", "blocks": [{"block_type": "paragraph", "content": "Second"}, '
+                '{"block_type": "paragraph", "content": "Thi'
+            ))])
+
+        mock_anthropic = MagicMock()
+        async_client = mock_anthropic.AsyncAnthropic.return_value.__aenter__.return_value
+        async_client.messages.create = AsyncMock(side_effect=create)
+
+        pages = ['page0', 'page0', 'page1', 'page1']
+        with patch.dict('sys.modules', {'anthropic': mock_anthropic}):
+            result = processor._process_chunked('\f'.join(pages), max_chunk_tokens=2)
+
+        assert [b.content for b in result.blocks] == ['First', 'Second']
+        assert result.metadata['partial'] is True
+
+    def test_empty_batch_response_is_invalid(self):
+        """Test a batch message without content raises a processing error."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False, use_batch=True)
+        processor._client = MagicMock()
+        batches = processor._client.messages.batches
+        batches.create.return_value = MagicMock(id='batch_1', processing_status='ended')
+        result = MagicMock(type='succeeded')
+        result.message.content = []
+        result.message.stop_reason = 'refusal'
+        batches.results.return_value = [MagicMock(custom_id='chunk_0', result=result)]
+
+        with pytest.raises(ClaudeInvalidResponseError):
+            processor._process_chunks_batch(['page'])
+
+    def test_single_chunk_document_is_sent_once(self):
+        """Test a large single-page document is sent directly, not re-chunked."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False)
+        processor._client = MagicMock()
+        stream_response(processor._client, ['{"title": "Doc", "blocks": []}'])
+
+        result = processor.process_text('x' * 700_000)
+
+        assert result.title == "Doc"
+        processor._client.messages.stream.assert_called_once()
+
+    def test_chunks_packed_by_token_estimate(self):
+        """Test pages are packed greedily into chunks by estimated tokens."""
+        processor = ClaudeProcessor(api_key='test-key', enable_cache=False, use_batch=True)
+        processor._process_chunks_batch = MagicMock(return_value=[
+            MagicMock(title='Doc', authors=[], abstract=None, metadata={}, blocks=[])
+        ])
+
+        # ~100, ~100, ~500 and ~50 tokens with a 250-token budget
+        pages = ['a' * 400, 'b' * 400, 'c' * 2000, 'd' * 200]
+        processor._process_chunked('\f'.join(pages), max_chunk_tokens=250)
+
+        chunks = processor._process_chunks_batch.call_args.args[0]
+        assert [chunk.split('\f') for chunk in chunks] == [pages[:2], pages[2:3], pages[3:]]
+
+    def test_processors_share_client_per_api_key(self):
+        """Test processors with the same API key reuse one Anthropic client."""
+        mock_anthropic = MagicMock()
+        mock_anthropic.Anthropic.side_effect = lambda api_key: MagicMock(api_key=api_key)
+
+        with patch.dict('sys.modules', {'anthropic': mock_anthropic}), \
+                patch.dict('pdf_converter.claude_processor._CLIENT_CACHE', clear=True):
+            first = ClaudeProcessor(api_key='key-a', enable_cache=False).client
+            second = ClaudeProcessor(api_key='key-a', enable_cache=False).client
+            other = ClaudeProcessor(api_key='key-b', enable_cache=False).client
+
+        assert first is second
+        assert other is not first
+        assert mock_anthropic.Anthropic.call_count == 2
+
+    @pytest.mark.parametrize("response_text", [
+        '```json\n{"title": "Doc", "blocks": []}\n```',
+        'Here is the JSON:\n{"title": "Doc", "blocks": []}\nLet me know if you need more.',
+        '<thought>Use {braces} carefully.</thought>{"title": "Doc", "blocks": []}',
+    ])
+    def test_extract_json_from_wrapped_response(self, response_text):
+        """Test JSON is found inside fences, prose and reasoning preambles."""
+        processor = ClaudeProcessor(enable_cache=False)
+
+        assert processor._extract_json(response_text) == {"title": "Doc", "blocks": []}
+
+    def test_extract_json_invalid_response(self):
+        """Test an unparseable response raises ClaudeInvalidResponseError."""
+        processor = ClaudeProcessor(enable_cache=False)
+
+        with pytest.raises(ClaudeInvalidResponseError):
+            processor._extract_json('{"title": "Doc", "blocks": [')
+
+
+
+class TestResponseCache:
+    """Tests for the file-based response cache."""
+
+    def test_round_trip(self, tmp_path):
+        """Test cached responses read back unchanged."""
+        response = {"title": "Café", "blocks": [{"block_type": "paragraph", "content": "Text"}]}
+
+        cache = ResponseCache(tmp_path)
+        cache.set("raw text", "v1", response)
+
+        assert cache.get("raw text", "v1") == response
+        assert cache.get("raw text", "v2") is None
+
+    def test_compressed_entries_with_plain_fallback(self, tmp_path):
+        """Test entries are zstd-compressed and older plain entries still hit."""
+        pytest.importorskip('zstandard')
+        cache = ResponseCache(tmp_path)
+        cache.set("raw text", "v1", {"title": "Doc"})
+
+        assert list(tmp_path.glob('*.json.zst'))
+        assert cache.get("raw text", "v1") == {"title": "Doc"}
+
+        with patch('pdf_converter.claude_processor.zstandard', None):
+            ResponseCache(tmp_path).set("older text", "v1", {"title": "Old"})
+        assert cache.get("older text", "v1") == {"title": "Old"}
+
+    def test_write_leaves_no_temporary_files(self, tmp_path):
+        """Test entries are renamed into place without leftover temp files."""
+        cache = ResponseCache(tmp_path)
+        cache.set("raw text", "v1", {"title": "Doc"})
+        cache.set("raw text", "v1", {"title": "Updated"})
+
+        assert not list(tmp_path.glob('*.tmp'))
+        assert len(list(tmp_path.iterdir())) == 1
+        assert cache.get("raw text", "v1") == {"title": "Updated"}
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        """Test an unreadable cache file is treated as a cache miss."""
+        cache = ResponseCache(tmp_path)
+        cache._get_cache_path(cache._get_cache_key("raw text", "v1")).write_bytes(b'{"title": ')
+
+        assert cache.get("raw text", "v1") is None
+
+
+class TestTokenBucket:
+    """Tests for proactive rate limiting."""
+
+    def test_requests_per_minute_budget(self):
+        """Test requests beyond the per-minute budget have to wait."""
+        bucket = _TokenBucket(requests_per_minute=2)
+
+        assert bucket._take(100) == 0
+        assert bucket._take(100) == 0
+        assert bucket._take(100) == pytest.approx(30, abs=0.1)
+
+    def test_oversized_request_waits_for_full_bucket(self):
+        """Test a request larger than the token budget still goes through."""
+        bucket = _TokenBucket(tokens_per_minute=1000)
+
+        assert bucket._take(5000) == 0
+        assert bucket._take(10) > 0
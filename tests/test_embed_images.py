@@ -0,0 +1,95 @@
+"""Tests for embedding images into converted HTML."""
+
+import importlib
+import json
+
+import pytest
+from bs4 import BeautifulSoup
+
+# The package re-exports the embed_images function under the module's name
+embed_module = importlib.import_module('pdf_converter.embed_images')
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+PARSERS = [
+    'html.parser',
+    pytest.param('lxml', marks=pytest.mark.skipif(not HAS_LXML, reason="lxml not installed")),
+]
+
+DOCUMENT = (
+    '<!DOCTYPE html>\n'
+    '<html lang="en"><head><style>body { margin: 0; }</style></head>'
+    '<body><main>'
+    '<p>Introduction without references.</p>'
+    '<p>As Fig. 2 shows, R&amp;D spending grew.</p>'
+    '<ul><li>A list item</li></ul>'
+    '</main></body></html>'
+)
+
+
+@pytest.fixture
+def document(tmp_path):
+    """Write an HTML file and an images directory with metadata."""
+    images_dir = tmp_path / 'images'
+    images_dir.mkdir()
+    (images_dir / 'chart.png').write_bytes(b'fake png bytes')
+    metadata = [
+        {'filename': 'chart.png', 'caption': 'Figure 2: Spending chart',
+         'alt_text': 'Bar chart of spending', 'page': 1, 'width': 40, 'height': 30},
+        {'filename': 'chart.png', 'caption': '', 'alt_text': 'Loose image', 'page': 3},
+    ]
+    (images_dir / 'images_metadata.json').write_text(json.dumps(metadata), encoding='utf-8')
+
+    html_path = tmp_path / 'doc.html'
+    html_path.write_text(DOCUMENT, encoding='utf-8')
+    return html_path, images_dir
+
+
+def run_embed(document, parser, monkeypatch, tmp_path):
+    """Embed images with the given tree builder and return the output."""
+    html_path, images_dir = document
+    output_path = tmp_path / f'out-{parser}.html'
+    monkeypatch.setattr(embed_module, 'HTML_PARSER', parser)
+    embed_module.embed_images(html_path, images_dir, output_path)
+    return output_path.read_text(encoding='utf-8')
+
+
+class TestEmbedImages:
+    """Tests for embed_images under each available parser."""
+
+    @pytest.mark.parametrize('parser', PARSERS)
+    def test_figure_placed_after_reference(self, document, parser, monkeypatch, tmp_path):
+        """Test that a numbered figure follows the paragraph citing it."""
+        soup = BeautifulSoup(run_embed(document, parser, monkeypatch, tmp_path), 'html.parser')
+
+        figure = soup.find('figure', id='figure-2')
+        assert figure is not None
+        assert 'Fig. 2 shows' in figure.find_previous_sibling('p').get_text()
+        assert figure.img['alt'] == 'Bar chart of spending'
+        assert figure.img['src'].startswith('data:image/png;base64,')
+
+    @pytest.mark.parametrize('parser', PARSERS)
+    def test_unmatched_image_appended(self, document, parser, monkeypatch, tmp_path):
+        """Test that images without a figure number go at the end of main."""
+        soup = BeautifulSoup(run_embed(document, parser, monkeypatch, tmp_path), 'html.parser')
+
+        last = soup.main.find_all(recursive=False)[-1]
+        assert last.name == 'figure'
+        assert last['id'] == 'figure-unmatched-1'
+        assert '.embedded-figure' in soup.style.string
+
+    @pytest.mark.skipif(not HAS_LXML, reason="lxml not installed")
+    def test_parsers_produce_same_document(self, document, monkeypatch, tmp_path):
+        """Test that lxml and html.parser build the same document tree."""
+        def tree(html):
+            soup = BeautifulSoup(html, 'html.parser')
+            return [(tag.name, tag.attrs, tag.get_text()) for tag in soup.find_all(True)]
+
+        # lxml drops the newline between the doctype and <html>; elements,
+        # attributes and text are the same
+        expected = tree(run_embed(document, 'html.parser', monkeypatch, tmp_path))
+        assert tree(run_embed(document, 'lxml', monkeypatch, tmp_path)) == expected
@@ -2,7 +2,7 @@
 
 import pytest
 import io
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import patch, MagicMock
 
 # These tests can run without PyMuPDF installed
 try:
@@ -16,6 +16,37 @@ except ImportError:
     HAS_PYMUPDF = False
 
 
+def mock_page(image_infos, text_blocks=()):
+    """Make a mocked PyMuPDF page with the given image placements and text blocks."""
+    page = MagicMock()
+    page.get_image_info.return_value = image_infos
+    page.get_text.return_value = list(text_blocks)
+    return page
+
+
+def open_mock_document(pages, images):
+    """Open a PDFImageExtractor on a mocked Document.
+
+    Args:
+        pages: Mocked pages, in document order
+        images: extract_image result for each xref
+    """
+    doc = MagicMock()
+    doc.__len__.return_value = len(pages)
+    doc.__getitem__.side_effect = pages.__getitem__
+    doc.extract_image.side_effect = lambda xref: images[xref]
+
+    mock_fitz = MagicMock()
+    mock_fitz.open.return_value = doc
+    with patch.dict('sys.modules', {'fitz': mock_fitz}):
+        return PDFImageExtractor('test.pdf', extract_vector_graphics=False)
+
+
+def image_dict(data):
+    """extract_image result for a 100x100 PNG with the given bytes."""
+    return {'image': data, 'ext': 'png', 'width': 100, 'height': 100}
+
+
 @pytest.mark.skipif(not HAS_PYMUPDF, reason="PyMuPDF not installed")
 class TestExtractedImage:
     """Tests for ExtractedImage dataclass."""
@@ -72,24 +103,82 @@ class TestPDFImageExtractor:
         images = extractor.extract_all()
         assert images == []
 
-    @patch('pdf_converter.image_extractor.fitz')
-    def test_extract_all_with_mock(self, mock_fitz):
+    def test_extract_all_with_mock(self):
         """Test extraction with mocked PyMuPDF."""
-        # Set up mock document
-        mock_doc = MagicMock()
-        mock_doc.__len__ = Mock(return_value=1)
-        mock_doc.__iter__ = Mock(return_value=iter([MagicMock()]))
+        page = mock_page([{'xref': 5, 'bbox': (10, 20, 110, 120)}])
+        extractor = open_mock_document([page], {5: image_dict(b'chart')})
 
-        mock_page = MagicMock()
-        mock_page.get_images.return_value = []
-        mock_doc.__getitem__ = Mock(return_value=mock_page)
+        images = extractor.extract_all()
 
-        mock_fitz.open.return_value = mock_doc
+        assert isinstance(images, list)
+        assert len(images) == 1
+        assert images[0].data == b'chart'
+        assert images[0].page == 1
+        page.get_image_info.assert_called_once_with(xrefs=True)
+
+    def test_inline_images_skipped(self):
+        """Test placements without an xref (inline images) are not extracted."""
+        page = mock_page([
+            {'xref': 0, 'bbox': (0, 0, 50, 50)},
+            {'xref': 7, 'bbox': (10, 20, 110, 120)},
+        ])
+        extractor = open_mock_document([page], {7: image_dict(b'photo')})
 
-        extractor = PDFImageExtractor('test.pdf')
         images = extractor.extract_all()
 
-        assert isinstance(images, list)
+        assert [img.data for img in images] == [b'photo']
+        extractor._doc.extract_image.assert_called_once_with(7)
+
+    def test_bbox_taken_from_image_info(self):
+        """Test the placement bbox reaches the image and its caption search."""
+        page = mock_page(
+            [{'xref': 5, 'bbox': (10.0, 20.0, 110.0, 120.0)}],
+            [(10, 130, 110, 145, 'Figure 1: Quarterly sales', 0, 0)],
+        )
+        extractor = open_mock_document([page], {5: image_dict(b'chart')})
+
+        images = extractor.extract_all()
+
+        assert images[0].bbox == (10.0, 20.0, 110.0, 120.0)
+        assert images[0].nearby_caption == 'Figure 1: Quarterly sales'
+
+    def test_shared_xref_extracted_once(self):
+        """Test an image placed on several pages is decoded only on the first."""
+        pages = [mock_page([{'xref': 5, 'bbox': (10, 20, 110, 120)}]) for _ in range(3)]
+        extractor = open_mock_document(pages, {5: image_dict(b'logo')})
+
+        images = extractor.extract_all()
+
+        assert [img.page for img in images] == [1]
+        extractor._doc.extract_image.assert_called_once_with(5)
+
+    def test_duplicate_content_dropped_before_caption_search(self):
+        """Test identical bytes under another xref are skipped without reading page text."""
+        first = mock_page([{'xref': 5, 'bbox': (10, 20, 110, 120)}])
+        second = mock_page([{'xref': 8, 'bbox': (10, 20, 110, 120)}])
+        extractor = open_mock_document(
+            [first, second], {5: image_dict(b'logo'), 8: image_dict(b'logo')}
+        )
+
+        images = extractor.extract_all()
+
+        assert [img.page for img in images] == [1]
+        first.get_text.assert_called_once()
+        second.get_text.assert_not_called()
+
+    def test_extract_from_page_keeps_duplicates(self):
+        """Test single-page extraction keeps images with the same content."""
+        page = mock_page([
+            {'xref': 5, 'bbox': (10, 20, 110, 120)},
+            {'xref': 8, 'bbox': (10, 200, 110, 300)},
+        ])
+        extractor = open_mock_document(
+            [page], {5: image_dict(b'logo'), 8: image_dict(b'logo')}
+        )
+
+        images = extractor.extract_from_page(0)
+
+        assert [img.bbox for img in images] == [(10, 20, 110, 120), (10, 200, 110, 300)]
 
     def test_get_mime_type(self):
         """Test MIME type detection."""